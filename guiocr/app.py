@@ -1,19 +1,19 @@
 from PyQt5 import QtGui
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
-from PyQt5.QtWidgets import QMainWindow, QListWidget, QListWidgetItem, QAbstractItemView, QWidget, QApplication, \
+from PyQt5.QtWidgets import QMainWindow, QListWidget, QAbstractItemView, QWidget, QApplication, \
     QButtonGroup, QPushButton, QTextEdit, QRadioButton, QCheckBox, QLabel, QSpacerItem, QMessageBox, QGroupBox, \
     QVBoxLayout, QHBoxLayout
 from PyQt5.QtCore import QObject, QThread, QSettings, pyqtSignal, pyqtSlot, Qt
 from .logger import logger
 from .shape import Shape
-import PIL.Image
 import math
 import os
-import io
+import time
 import json
 import functools
 import imgviz
+import numpy as np
 from guiocr import __appname__
 from guiocr import PY2
 from guiocr import QT5
@@ -30,7 +30,16 @@ here = os.path.dirname(os.path.abspath(__file__))
 class MainWindow(QMainWindow):
     FIT_WINDOW, FIT_WIDTH, MANUAL_ZOOM = 0, 1, 2
 
-    def __init__(self):
+    # 发往工作线程的请求（跨线程信号，排队执行）
+    requestWarmup = pyqtSignal(str, bool)
+    requestRegions = pyqtSignal(str, object, object, str)
+    # 预取线程解码完成（排队到界面线程）
+    prefetchLoaded = pyqtSignal(str, object)
+    # 后台扫描目录：分批发现的图像、扫描完成后的完整列表
+    imagesFound = pyqtSignal(int, object)
+    scanFinished = pyqtSignal(int, object)
+
+    def __init__(self, config=None):
         super().__init__()  # 调用父类构造函数，创建QWidget窗体
         self.last_selectBtnName = ""
         self.last_ComboxText = ""
@@ -40,11 +49,14 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(__appname__)
 
         # 加载默认配置
-        config = get_config()
+        if config is None:
+            config = get_config()
         self._config = config
 
         # 程序数据
         self.image = QtGui.QImage()
+        self.imageArray = None  # 解码后的 RGB 像素，与OCR工作线程共享
+        self.resultStore = None  # 当前图像的OCR结果（OCRResultStore）
         self.dataDict = {}  # 用于保持标注数据
         self.imagePath = None
         self.recentFiles = []
@@ -65,12 +77,59 @@ class MainWindow(QMainWindow):
             Qt.Vertical: {},
         }  # key=filename, value=scroll_value
 
-        # 线程
+        # 线程：工作线程常驻，任务通过信号排队到工作线程执行
         self.workThread = QThread()
-        self.processor = OCR_qt()
+        self.processor = OCR_qt(config=self._config["ocr"])
         self.processor.moveToThread(self.workThread)
         self.processor.sendResult.connect(self.onReceiveResults)
-        self.workThread.started.connect(self.processor.start)
+        self.processor.sendStatus.connect(self.onEngineStatus)
+        self.processor.warmupFinished.connect(self.onWarmupFinished)
+        self.processor.sendRegionResults.connect(self.onReceiveRegionResults)
+        self.processor.sendBoxes.connect(self.onReceiveBoxes)
+        self.processor.sendTexts.connect(self.onReceiveTexts)
+        self.processor.jobCancelled.connect(self.onJobCancelled)
+        self.processor.jobFailed.connect(self.onJobFailed)
+        self.processor.regionsFailed.connect(self.onRegionsFailed)
+        # 当前图像对应的识别任务号，以及已流式显示的任务号
+        self._jobId = None
+        self._streamedJob = None
+        self.requestRegions.connect(self.processor.recognizeRegions)
+        self.requestWarmup.connect(self.processor.warmup)
+        self.workThread.start()
+        self._warmupLan = None
+        self._warmupRequested = False
+
+        # 目录浏览预取：后台解码后续图像，可选预先识别
+        prefetch_config = self._config.get("prefetch") or {}
+        self.prefetchCount = prefetch_config.get("count", 2)
+        self.prefetchOcr = prefetch_config.get("ocr", False)
+        self.prefetcher = utils.ImagePrefetcher(
+            utils.load_image_file,
+            workers=prefetch_config.get("workers", 1),
+            on_loaded=self.prefetchLoaded.emit,
+        )
+        self.prefetchLoaded.connect(self.onPrefetchLoaded)
+        self._prefetchJobs = {}  # job_id -> (filename, lan)
+        self._jobLan = None
+        # 最近浏览/预取图像的像素、pixmap 和识别结果
+        self.imageCache = utils.ImageCache(
+            (self._config.get("image_cache") or {}).get("max_mb", 1024)
+        )
+        # 打开目录时在后台扫描，结果边扫描边加入 imageList
+        dir_index_config = self._config.get("dir_index") or {}
+        self.dirScanner = utils.DirectoryScanner(
+            on_found=self.imagesFound.emit,
+            on_finished=self.scanFinished.emit,
+            index_dir=dir_index_config.get("dir"),
+            use_index=dir_index_config.get("enabled", True),
+        )
+        self.imagesFound.connect(self.onImagesFound)
+        self.scanFinished.connect(self.onScanFinished)
+        self._scanId = None
+        self._scanOpened = None  # 已请求打开第一张图像的扫描编号
+        self._scanPattern = None
+        self._scanLoad = True
+        self._scanStart = 0.0
 
         # 单选按钮组
         self.checkBtnGroup = QButtonGroup(self)
@@ -101,10 +160,14 @@ class MainWindow(QMainWindow):
         self._ui.btnSaveAll.clicked.connect(self.saveToFile)
         # self._ui.btnAddShape.clicked.connect(self.newShape)
         # self._ui.btnEditShape.clicked.connect(self.setEditMode)
-        self._ui.listWidgetResults.itemClicked.connect(self.onItemResultClicked)
+        # 识别结果列表：用基于 OCRResultStore 的模型视图替换设计器中的 QListWidget
+        resultView = ResultListView(self._ui.tab_2)
+        resultView.setObjectName("listWidgetResults")
+        self._ui.verticalLayout_6.replaceWidget(self._ui.listWidgetResults, resultView)
+        self._ui.listWidgetResults.deleteLater()
+        self._ui.listWidgetResults = resultView
+        self._ui.listWidgetResults.clicked.connect(self.onItemResultClicked)
         # self._ui.listWidgetResults.itemSelectionChanged.connect(self.onItemResultClicked)
-        self._ui.listWidgetResults.clear()
-        # self.addResultItem(shape=None,txt="test3")
 
         # 控件布局
         """左侧：区域标签列表"""
@@ -126,6 +189,7 @@ class MainWindow(QMainWindow):
             epsilon=self._config["epsilon"],
             double_click=self._config["canvas"]["double_click"],
             num_backups=self._config["canvas"]["num_backups"],
+            lod_size=self._config["canvas"].get("lod_size", 12),
         )
         self.canvas.zoomRequest.connect(self.zoomRequest)
         self.canvas.newShape.connect(self.newShape)
@@ -169,6 +233,8 @@ class MainWindow(QMainWindow):
         self._initActions()
 
         # status bar
+        self.engineStatusLabel = QLabel()
+        self.statusBar().addPermanentWidget(self.engineStatusLabel)
         self.statusBar().showMessage(str(self.tr("%s started.")) % __appname__)
         self.statusBar().show()
 
@@ -331,6 +397,17 @@ class MainWindow(QMainWindow):
             enabled=False,
         )
 
+        recognizeSelection = action(
+            self.tr("Recognize Selection"),
+            self.recognizeSelection,
+            shortcuts["recognize_selection"],
+            "play_black",
+            self.tr("Re-read the text inside the selected boxes"),
+            enabled=False,
+        )
+        self.addAction(recognizeSelection)
+        self.canvas.menus[0].addAction(recognizeSelection)
+
         hideAll = action(
             self.tr("&Hide\nPolygons"),
             functools.partial(self.togglePolygons, False),
@@ -468,6 +545,7 @@ class MainWindow(QMainWindow):
             deleteFile=deleteFile,
             # toggleKeepPrevMode=toggle_keep_prev_mode,
             delete=delete,
+            recognizeSelection=recognizeSelection,
             # edit=edit,
             # duplicate=duplicate,
             # copy=copy,
@@ -542,6 +620,33 @@ class MainWindow(QMainWindow):
 
         # self.canvas.vertexSelected.connect(self.actions.removePoint.setEnabled)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._warmupRequested and self._config["ocr"]["warmup"]:
+            self._warmupRequested = True
+            # 等窗口绘制完成后再开始预热
+            QtCore.QTimer.singleShot(0, self.warmupEngine)
+
+    def closeEvent(self, event):
+        self.dirScanner.cancel()
+        self.prefetcher.shutdown()
+        self.workThread.quit()
+        self.workThread.wait()
+        self.processor.shutdown()
+        super().closeEvent(event)
+
+    def warmupEngine(self):
+        lan = self._ui.comboBoxLanguage.currentText()
+        self._warmupLan = lan
+        self.requestWarmup.emit(lan, True)
+
+    def onEngineStatus(self, message):
+        self.engineStatusLabel.setText(message)
+
+    def onWarmupFinished(self, lan, elapsed):
+        self._warmupLan = None
+        self.engineStatusLabel.setText(f"模型就绪({lan}, {elapsed:.1f}s)")
+
     def getIcon(self, iconName: str):
         self.icons_dir = os.path.join(here, "./icons")
         path = os.path.join(":/", self.icons_dir, f"{iconName}.png")
@@ -573,22 +678,6 @@ class MainWindow(QMainWindow):
             self.recentFiles.pop()
         self.recentFiles.insert(0, filename)
 
-    def addResultItem(self, shape=None, txt=""):
-        """
-        为labellist、listWidgetResults添加一条记录
-        Args:
-            shape:
-            txt:
-
-        Returns:
-
-        """
-
-        newItem = QListWidgetItem(txt, self._ui.listWidgetResults)
-        newItem.setCheckState(Qt.Checked)
-        newItem.setFlags(Qt.ItemIsEditable | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-        self._ui.listWidgetResults.addItem(newItem)
-
     def onItemResultClicked(self):
         """
         listWidgetResults选中一条记录时，激活对应的区域
@@ -596,58 +685,51 @@ class MainWindow(QMainWindow):
         Returns:
 
         """
-        for id in self._ui.listWidgetResults.selectedIndexes():
-            # 选取labelList中对应idx的item
-            idx = int(id.row())
-            item = self.labelList[idx]
-            self.labelList.selectItem(item)
-            self.labelList.scrollToItem(item)
-            # self.labelSelectionChanged()
-            # for shape in self.canvas.shapes:
-            #     if item.shape.label == shape.label:
-            #         self.canvas.selectShapes([shape])
+        # 结果行即 resultStore 的行号，一次性选中 labelList 中对应的项
+        items = [
+            self.labelList.itemForStoreRow(row)
+            for row in self._ui.listWidgetResults.selectedRows()
+        ]
+        self.labelList.selectItems([item for item in items if item is not None])
 
     # React to labelList select signals.
     def labelSelectionChanged(self):
         if self._noSelectionSlot:
             return
         if self.canvas.editing():
-            selected_shapes = []
-            for item in self.labelList.selectedItems():
-                selected_shapes.append(item.shape())
-                # 选中listWidgetResults对应的item
-                index = self.labelList.model().indexFromItem(item)
-                self._ui.listWidgetResults.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
-                self._ui.listWidgetResults.scrollTo(index)
+            items = self.labelList.selectedItems()
+            selected_shapes = [item.shape() for item in items]
+            # 选中listWidgetResults对应的行
+            self.selectResultRows(items)
             if selected_shapes:
                 self.canvas.selectShapes(selected_shapes)
             else:
                 self.canvas.deSelectShape()
 
+    def selectResultRows(self, items):
+        """listWidgetResults 中选中 labelList 各项对应的行（手绘区域没有对应行）"""
+        self._ui.listWidgetResults.selectRows(
+            [item.storeRow() for item in items if item.storeRow() is not None]
+        )
+
     # React to canvas shape select signals.
     def shapeSelectionChanged(self, selected_shapes):
         self._noSelectionSlot = True
         for shape in self.canvas.selectedShapes:
             shape.selected = False
-        self.labelList.clearSelection()
         self.canvas.selectedShapes = selected_shapes
+        items = []
         for shape in self.canvas.selectedShapes:
             shape.selected = True
-            item = self.labelList.findItemByShape(shape)
-            self.labelList.selectItem(item)
-            self.labelList.scrollToItem(item)
-
-        # 选中listWidgetResults对应的文本列表项
-        for id in self.labelList.selectedIndexes():
-            idx = int(id.row())
-            item = self._ui.listWidgetResults.item(idx)
-            # item.setSelected(True)
-            self._ui.listWidgetResults.selectionModel().select(id, QtCore.QItemSelectionModel.Select)
-            self._ui.listWidgetResults.scrollToItem(item)
+            items.append(self.labelList.findItemByShape(shape))
+        # labelList 与 listWidgetResults 各只做一次选择变更和一次滚动
+        self.labelList.selectItems(items)
+        self.selectResultRows(items)
 
         self._noSelectionSlot = False
         n_selected = len(selected_shapes)
         self.actions.delete.setEnabled(n_selected)
+        self.actions.recognizeSelection.setEnabled(n_selected)
         # self.actions.duplicate.setEnabled(n_selected)
         # self.actions.copy.setEnabled(n_selected)
         # self.actions.edit.setEnabled(n_selected == 1)
@@ -733,6 +815,9 @@ class MainWindow(QMainWindow):
         if filename is None:
             filename = self.settings.value("filename", "")
         filename = str(filename)
+        # 离开当前图像：取消排队中和正在执行的旧任务，保留预取范围内的后台识别
+        prefetchPaths = self.prefetchPaths(filename)
+        self.processor.cancelJobs(keep_paths=[filename] + prefetchPaths)
         if not QtCore.QFile.exists(filename):
             self.errorMessage(
                 self.tr("Error opening file"),
@@ -743,8 +828,17 @@ class MainWindow(QMainWindow):
         self.status(
             str(self.tr("Loading %s...")) % os.path.basename(str(filename))
         )
-        self.imageData = self.load_image_file(filename)
-        image = QtGui.QImage.fromData(self.imageData)
+        cached = self.imageCache.get(filename)
+        if cached is None:
+            stamp = utils.file_stamp(filename)
+            self.imageArray = self.load_image_file(filename)
+            if self.imageArray is not None:
+                cached = self.imageCache.put(filename, self.imageArray, stamp)
+        else:
+            self.imageArray = cached.image
+        image = QtGui.QImage()
+        if self.imageArray is not None:
+            image = utils.img_arr_to_qimage(self.imageArray)
         self._ui.btnStartProcess.setText("开始")
         self._ui.listWidgetResults.clear()
         self.labelList.clear()
@@ -767,7 +861,9 @@ class MainWindow(QMainWindow):
         self.filename = filename
         if self._config["keep_prev"]:
             prev_shapes = self.canvas.shapes
-        self.canvas.loadPixmap(QtGui.QPixmap.fromImage(image))
+        if cached.pixmap is None:
+            self.imageCache.setPixmap(filename, QtGui.QPixmap.fromImage(image))
+        self.canvas.loadPixmap(cached.pixmap)
         flags = {k: False for k in self._config["flags"] or []}
 
         self.canvas.setEnabled(True)
@@ -786,7 +882,7 @@ class MainWindow(QMainWindow):
                 )
         # set brightness contrast values
         dialog = BrightnessContrastDialog(
-            utils.img_data_to_pil(self.imageData),
+            self.imageArray,
             self.onNewBrightnessContrast,
             parent=self,
         )
@@ -813,12 +909,68 @@ class MainWindow(QMainWindow):
         self.toggleActions(True)
         self.canvas.setFocus()
         self.status(str(self.tr("Loaded %s")) % os.path.basename(str(filename)))
+        self.showCachedResults()
+        self.prefetchImages(prefetchPaths)
         return True
 
+    def prefetchImages(self, paths):
+        """后台解码 paths 中尚未缓存的图像；已缓存的直接交给 onPrefetchLoaded"""
+        missing = []
+        for path in paths:
+            cached = self.imageCache.get(path)
+            if cached is None:
+                missing.append(path)
+            else:
+                self.onPrefetchLoaded(path, cached.image)
+        self.prefetcher.prefetch(missing)
+
+    def prefetchPaths(self, filename):
+        """目录中 filename 之后的 prefetchCount 张图像，以及前一张"""
+        if not self.prefetchCount or filename not in self.imageList:
+            return []
+        index = self.imageList.index(filename)
+        paths = self.imageList[index + 1:index + 1 + self.prefetchCount]
+        if index > 0:
+            paths.append(self.imageList[index - 1])
+        return paths
+
+    def onPrefetchLoaded(self, filename, imageArray):
+        """预取的图像解码完成：放入缓存，按需以低优先级提交后台识别"""
+        if filename not in self.prefetchPaths(self.filename):
+            return
+        if filename not in self.imageCache:
+            self.imageCache.put(filename, imageArray)
+        if not self.prefetchOcr:
+            return
+        lan = self._ui.comboBoxLanguage.currentText()
+        if (
+                self.imageCache.result(filename, lan) is not None
+                or (filename, lan) in self._prefetchJobs.values()
+        ):
+            return
+        job_id = self.processor.submit(filename, image=imageArray, lan=lan, priority=1, stream=False)
+        self._prefetchJobs[job_id] = (filename, lan)
+
+    def showCachedResults(self):
+        """切换到已识别过（或正在后台识别）的图像时直接显示结果"""
+        key = (self.filename, self._ui.comboBoxLanguage.currentText())
+        result = self.imageCache.result(*key)
+        if result is not None:
+            self.add_ocr_results(result)
+            self._ui.btnStartProcess.setText("解析完成")
+        elif key in self._prefetchJobs.values():
+            # 提升为前台任务，完成后由 onReceiveResults 显示
+            self._jobId = self.processor.submit(self.filename, image=self.imageArray, lan=key[1])
+            self._jobLan = key[1]
+            self._ui.btnStartProcess.setText("解析中...")
+
     def startProcess(self):
         if not self.checkBtnGroup.checkedButton():
             self.errorMessage("提示", "请先选择任务配置")
             return
+        if not self.filename or self.imageArray is None:
+            self.errorMessage("提示", "请先打开图像")
+            return
 
         selectBtnName = self.checkBtnGroup.checkedButton().objectName()
         load = True
@@ -827,21 +979,29 @@ class MainWindow(QMainWindow):
         self.last_selectBtnName = selectBtnName
         self.last_ComboxText = self._ui.comboBoxLanguage.currentText()
 
-        if load:
+        # 引擎池中已有该语言的模型（或正在预热）时无需提示
+        if (
+                load
+                and self._warmupLan != self.last_ComboxText
+                and not self.processor.hasEngine(lan=self.last_ComboxText)
+        ):
             self.InfoMessage("提示", "首次执行需要加载模型，点击OK后耐心等待！")
 
 
         # TODO:多线程处理+进度条
 
+        self._jobLan = self._ui.comboBoxLanguage.currentText()
         if selectBtnName == "checkBox_ocr":
             # 文本检测+识别
-            self.processor.set_task(self.filename, cls=True, lan=self._ui.comboBoxLanguage.currentText(), load=load)
+            self._jobId = self.processor.submit(self.filename, image=self.imageArray,
+                                                lan=self._ui.comboBoxLanguage.currentText())
             self._ui.btnStartProcess.setText("解析中...")
             # self.result = ocr(self.filename, cls=True, lan=self._ui.comboBoxLanguage.currentText())
             # self.add_ocr_results(self.result)
         elif selectBtnName == "checkBox_det":
             # TODO:文本检测
-            self.processor.set_task(self.filename, cls=False, lan=self._ui.comboBoxLanguage.currentText(), load=load)
+            self._jobId = self.processor.submit(self.filename, image=self.imageArray,
+                                                lan=self._ui.comboBoxLanguage.currentText())
             # self.result = ocr(self.filename, cls=False, lan=self._ui.comboBoxLanguage.currentText())
             # self.add_ocr_results(self.result)
         elif selectBtnName == "checkBox_recog":
@@ -854,118 +1014,135 @@ class MainWindow(QMainWindow):
             # self.result = structure_analysis(self.filename,self.output_dir)
             # self.add_structure_results(self.result)
 
-        self.workThread.start()
 
         # 显示结果页
         self._ui.tabWidgetResult.setCurrentIndex(1)
 
-    def onReceiveResults(self, result):
-        self.workThread.quit()
+    def isCurrentJob(self, job_id, img_path):
+        # 用户已切换图像时丢弃结果（结果仍会写入缓存）
+        return img_path == self.filename and job_id == self._jobId
 
-        # 检测+识别结果
-        self.add_ocr_results(result)
+    def onReceiveResults(self, job_id, img_path, result, store=None):
+        key = self._prefetchJobs.pop(job_id, None)
+        if key is not None:
+            self.imageCache.setResult(*key, result)
+        if not self.isCurrentJob(job_id, img_path):
+            return
+        self.imageCache.setResult(img_path, self._jobLan, result)
+        # 检测+识别结果；流式输出时已逐步显示，无需重建
+        if self._streamedJob != job_id:
+            self.add_ocr_results(result, store)
+        self._streamedJob = None
 
         self._ui.btnStartProcess.setText("解析完成")
         # TODO：其他分析结果
 
-    def add_ocr_results(self, result):
+    def onReceiveBoxes(self, job_id, img_path, boxes):
+        """流式输出：检测完成，先绘制文本框，文本待识别后填入"""
+        if not self.isCurrentJob(job_id, img_path):
+            return
+        self._streamedJob = job_id
+        self.add_ocr_results([{"rec_polys": boxes, "rec_texts": ["…"] * len(boxes)}])
+        self._ui.btnStartProcess.setText("识别中...")
+
+    def onReceiveTexts(self, job_id, img_path, start, texts):
+        if not self.isCurrentJob(job_id, img_path):
+            return
+        # 文本写入 resultStore，结果列表只刷新这一段
+        self._ui.listWidgetResults.model().setTexts(start, [txt for txt, score in texts])
+
+    def add_ocr_results(self, result, store=None):
         """Normalize and add OCR results to UI.
 
         Supports both older PaddleOCR list-of-lines format and newer
-        dict-based document pipeline format.
+        dict-based document pipeline format. Boxes are kept in a compact
+        OCRResultStore (built on the worker thread when given as `store`);
+        a Shape is only created for a box once it is hovered, selected or
+        otherwise needed. All rows are inserted in one batch with the
+        views' updates disabled.
         """
-        self._ui.listWidgetResults.clear()
-
-        boxes = []
-        txts = []
-
-        # Normalize result which can be:
-        # - older format: result = [ [ [box, (text, score)], ... ], ... ]
-        # - newer format: result = [ { 'rec_polys': ..., 'rec_texts': ..., ... }, ... ]
-        data = None
-        if isinstance(result, list) and len(result) > 0 and isinstance(result[0], dict):
-            data = result[0]
-        elif isinstance(result, dict):
-            data = result
-        elif isinstance(result, list):
-            # older format: take first page
-            try:
-                page = result[0]
-                boxes = [line[0] for line in page]
-                txts = [line[1][0] for line in page]
-            except Exception:
-                boxes = []
-                txts = []
-
-        if data is not None:
-            # Prefer recognized polygons and texts
-            if "rec_polys" in data and "rec_texts" in data:
-                boxes = data.get("rec_polys", [])
-                txts = data.get("rec_texts", [])
-            elif "rec_texts" in data and "rec_polys" not in data and "dt_polys" in data:
-                boxes = data.get("dt_polys", [])
-                txts = data.get("rec_texts", [])
-            elif "dt_polys" in data and "rec_texts" in data:
-                boxes = data.get("dt_polys", [])
-                txts = data.get("rec_texts", [])
-            else:
-                # best-effort fallback: try to find arrays that look like boxes/texts
-                boxes = data.get("rec_polys", data.get("dt_polys", []))
-                txts = data.get("rec_texts", [])
-
-        # Ensure types are list-like and lengths match
-        try:
-            if not hasattr(boxes, "__len__"):
-                boxes = list(boxes)
-        except Exception:
-            boxes = []
+        t0 = time.perf_counter()
+        if store is None:
+            store = OCRResultStore.fromResult(result)
+        store.decorate = self._update_shape_color
+        if len(store):
+            store.colors[:] = self._store_colors(store)
+
+        views = (self.labelList, self._ui.listWidgetResults, self.canvas)
+        for view in views:
+            view.setUpdatesEnabled(False)
         try:
-            if not hasattr(txts, "__len__"):
-                txts = list(txts)
-        except Exception:
-            txts = [""] * len(boxes)
-
-        # Truncate to smallest length when appropriate
-        if txts:
-            n = min(len(boxes), len(txts))
-            boxes = boxes[:n]
-            txts = txts[:n]
-        else:
-            txts = [""] * len(boxes)
-
-        shapes = []
-        for i, box in enumerate(boxes):
-            try:
-                # box is expected to be iterable of points
-                p0 = box[0]
-                p2 = box[2]
-                x1 = int(p0[0])
-                y1 = int(p0[1])
-                x2 = int(p2[0])
-                y2 = int(p2[1])
-            except Exception:
-                # fallback: compute bounding box from all points
-                try:
-                    pts = [(int(p[0]), int(p[1])) for p in box]
-                    xs = [pt[0] for pt in pts]
-                    ys = [pt[1] for pt in pts]
-                    x1, y1 = min(xs), min(ys)
-                    x2, y2 = max(xs), max(ys)
-                except Exception:
-                    # give up for this item
-                    continue
-
-            label = f"({x1},{y1}),({x2},{y2})"
-            shape = Shape(label=label, shape_type="rectangle", group_id=i)
-            shape.addPoint(QtCore.QPointF(x1, y1))
-            shape.addPoint(QtCore.QPointF(x2, y2))
-            shapes.append(shape)
-
-            txt = txts[i] if i < len(txts) else ""
-            self.addLabel(shape)
-            self.addResultItem(shape, txt)
+            self.labelList.clear()
+            self.resultStore = store
+            self.labelList.setStore(store)
+            self._ui.listWidgetResults.setStore(store)
+            if len(store):
+                for action in self.actions.onShapesPresent:
+                    action.setEnabled(True)
+            self.loadShapes([])
+            self.canvas.loadStore(store)
+        finally:
+            for view in views:
+                view.setUpdatesEnabled(True)
+        if len(store):
+            self.status(f"显示 {len(store)} 条结果，用时 {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def _store_colors(self, store):
+        """store 中每行文本框的颜色，自动配色时按行号批量取色"""
+        if self._config["shape_color"] == "auto":
+            label_ids = np.arange(len(store)) + self._config["shift_auto_shape_color"]
+            return LABEL_COLORMAP[label_ids % len(LABEL_COLORMAP)]
+        return [self._get_rgb_by_label(store.label(row), row) for row in range(len(store))]
 
-        self.loadShapes(shapes)
+    def recognizeSelection(self):
+        """只对选中的区域重新识别：从内存图像中裁剪，跳过检测"""
+        if self.imageArray is None or not self.canvas.selectedShapes:
+            return
+        pad = 4
+        height, width = self.imageArray.shape[:2]
+        rows = []
+        crops = []
+        for shape in self.canvas.selectedShapes:
+            # 结果按 resultStore 的行号写回；手绘区域不在 store 中，跳过
+            row = self.labelList.findItemByShape(shape).storeRow()
+            if row is None:
+                continue
+            xs = [p.x() for p in shape.points]
+            ys = [p.y() for p in shape.points]
+            x1 = max(0, int(min(xs)) - pad)
+            y1 = max(0, int(min(ys)) - pad)
+            x2 = min(width, int(math.ceil(max(xs))) + pad)
+            y2 = min(height, int(math.ceil(max(ys))) + pad)
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                continue
+            rows.append(row)
+            crops.append(self.imageArray[y1:y2, x1:x2])
+        if rows:
+            self.status(f"区域识别中({len(rows)} 个)...")
+            self.requestRegions.emit(self.filename, rows, crops, self._ui.comboBoxLanguage.currentText())
+
+    def onJobCancelled(self, job_id, img_path):
+        self._prefetchJobs.pop(job_id, None)
+        if self.isCurrentJob(job_id, img_path):
+            self._ui.btnStartProcess.setText("开始")
+
+    def onJobFailed(self, job_id, img_path, message):
+        self._prefetchJobs.pop(job_id, None)
+        if self.isCurrentJob(job_id, img_path):
+            self._ui.btnStartProcess.setText("开始")
+            self.errorMessage("识别失败", f"{img_path}<br/>{message}")
+
+    def onRegionsFailed(self, img_path, message):
+        if img_path == self.filename:
+            self.status(f"区域识别失败: {message}")
+
+    def onReceiveRegionResults(self, img_path, rows, results):
+        """用区域识别结果更新 resultStore 及 listWidgetResults 中对应的行"""
+        if img_path != self.filename:
+            return
+        for row, (txt, score) in zip(rows, results):
+            if row < self._ui.listWidgetResults.count():
+                self._ui.listWidgetResults.setText(row, txt)
 
     def add_structure_results(self, result):
         # TODO: 版面分析
@@ -975,11 +1152,8 @@ class MainWindow(QMainWindow):
 
     def copyToClipboard(self):
         contents = []
-        for id in self._ui.listWidgetResults.selectionModel().selectedRows():  # selectedIndexes():#for item in self._ui.listWidgetResults.selectedItems():
-            # 选取labelList中对应idx的item
-            idx = int(id.row())
-            content = self._ui.listWidgetResults.item(idx).text()  # item = self.labelList[idx]
-            contents.append(content)
+        for idx in self._ui.listWidgetResults.selectedRows():
+            contents.append(self._ui.listWidgetResults.text(idx))
         txt = "\n".join(contents)
         self._ui.statusbar.setStatusTip(f"Copy {len(contents)} results to clipboard!")
         clipboard = QApplication.clipboard()
@@ -990,24 +1164,16 @@ class MainWindow(QMainWindow):
         pass
 
     def load_image_file(self, filename):
-        try:
-            image_pil = PIL.Image.open(filename)
-        except IOError:
-            logger.error("Failed opening image file: {}".format(filename))
-            return
-
-        # apply orientation to image according to exif
-        image_pil = utils.apply_exif_orientation(image_pil)
-
-        with io.BytesIO() as f:
-            ext = os.path.splitext(filename)[1].lower()
-            if ext in [".jpg", ".jpeg"]:
-                format = "JPEG"
-            else:
-                format = "PNG"
-            image_pil.save(f, format=format)
-            f.seek(0)
-            return f.read()
+        """返回解码后的只读 RGB 像素，画布、亮度/对比度和OCR工作线程共享同一块内存"""
+        # 优先使用预取线程已解码的结果
+        imageArray = self.prefetcher.take(filename)
+        if imageArray is None:
+            try:
+                imageArray = utils.load_image_file(filename)
+            except IOError:
+                logger.error("Failed opening image file: {}".format(filename))
+                return
+        return imageArray
 
     def saveFile(self, _value=False):
         assert not self.image.isNull(), "cannot save empty image"
@@ -1145,7 +1311,8 @@ class MainWindow(QMainWindow):
         self.labelList.clear()
         self.filename = None
         self.imagePath = None
-        self.imageData = None
+        self.imageArray = None
+        self.resultStore = None
         self.labelFile = None
         self.otherData = None
         self.canvas.resetState()
@@ -1186,18 +1353,14 @@ class MainWindow(QMainWindow):
             text = shape.label
         else:
             text = "{} ({})".format(shape.label, shape.group_id)
-        label_list_item = LabelListWidgetItem(text, shape)
+        self._update_shape_color(shape)
+        label_list_item = LabelListWidgetItem(
+            text, shape, color=shape.fill_color.getRgb()[:3]
+        )
         self.labelList.addItem(label_list_item)
         for action in self.actions.onShapesPresent:
             action.setEnabled(True)
 
-        self._update_shape_color(shape)
-        label_list_item.setText(
-            '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                text, *shape.fill_color.getRgb()[:3]
-            )
-        )
-
     def loadShapes(self, shapes, replace=True):
         self._noSelectionSlot = True
         # for shape in shapes:
@@ -1301,7 +1464,7 @@ class MainWindow(QMainWindow):
 
     def brightnessContrast(self, value):
         dialog = BrightnessContrastDialog(
-            utils.img_data_to_pil(self.imageData),
+            self.imageArray,
             self.onNewBrightnessContrast,
             parent=self,
         )
@@ -1325,12 +1488,18 @@ class MainWindow(QMainWindow):
         self.canvas.update()
 
     def labelItemChanged(self, item):
-        shape = item.shape()
-        self.canvas.setShapeVisible(shape, item.checkState() == Qt.Checked)
+        visible = item.checkState() == Qt.Checked
+        shape = item.shape(materialize=False)
+        if shape is None and item.storeRow() is not None:
+            self.canvas.setRowVisible(item.storeRow(), visible)
+        else:
+            self.canvas.setShapeVisible(shape, visible)
 
     def labelOrderChanged(self):
         self.setDirty()
-        self.canvas.loadShapes([item.shape() for item in self.labelList])
+        # 按列表顺序重排画布的绘制顺序，只用已有的 Shape，不为 store 的行生成 Shape
+        shapes, rows = self.labelList.paintOrder()
+        self.canvas.reorder(shapes, rows)
 
     def newShape(self):
         flags = {}
@@ -1371,18 +1540,14 @@ class MainWindow(QMainWindow):
             text = shape.label
         else:
             text = "{} ({})".format(shape.label, shape.group_id)
-        label_list_item = LabelListWidgetItem(text, shape)
+        self._update_shape_color(shape)
+        label_list_item = LabelListWidgetItem(
+            text, shape, color=shape.fill_color.getRgb()[:3]
+        )
         self.labelList.addItem(label_list_item)
         for action in self.actions.onShapesPresent:
             action.setEnabled(True)
 
-        self._update_shape_color(shape)
-        label_list_item.setText(
-            '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                text, *shape.fill_color.getRgb()[:3]
-            )
-        )
-
     def copyShape(self):
         self.canvas.endMove(copy=True)
         for shape in self.canvas.selectedShapes:
@@ -1446,22 +1611,19 @@ class MainWindow(QMainWindow):
             y2 = int(shape.points[1].y())
             shape.label = f"({x1},{y1}),({x2},{y2})"
             text = "{} ({})".format(shape.label, shape.group_id)  # f"({x1},{y1}),({x2},{y2})"
-            r, g, b = rgb
-            item.setText(
-                '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                    text, r, g, b
-                )
-            )
+            item.setText(text)
+            item.setColor(rgb)
             self.labelList.clearSelection()
             self.labelList.selectItem(item)
             self.labelList.scrollToItem(item)
-            self.selectRegionId = self.labelList.selectItemIndex(item)
+            self.selectRegionId = self.labelList.rowOfItem(item)
 
         # self.setDirty()
 
     def togglePolygons(self, value):
-        for item in self.labelList:
-            item.setCheckState(Qt.Checked if value else Qt.Unchecked)
+        # 只对已有 Shape 的行逐个通知画布，其余行直接改 store.visible
+        self.labelList.setAllChecked(value)
+        self.canvas.update()
 
     def openDirDialog(self, _value=False, dirpath=None):
         defaultOpenDirPath = dirpath if dirpath else "."
@@ -1492,28 +1654,41 @@ class MainWindow(QMainWindow):
         self.labelList.clear()
         self._ui.listWidgetResults.clear()
         self.imageList.clear()  # 清除之前的图像列表
+        self.prefetcher.clear()
 
-        for filename in self.scanAllImages(dirpath):
-            if pattern and pattern not in filename:
-                continue
-            self.imageList.append(filename)  # 加载新文件夹中的图像
-
-        self.openNextImg(load=load)
+        self._scanPattern = pattern
+        self._scanLoad = load
+        self._scanStart = time.perf_counter()
+        self._scanId = self.dirScanner.start(dirpath, utils.supported_extensions())
+        self.status("正在扫描目录...", delay=0)
 
-    def scanAllImages(self, folderPath):
-        extensions = [
-            ".%s" % fmt.data().decode().lower()
-            for fmt in QtGui.QImageReader.supportedImageFormats()
-        ]
-
-        images = []
-        for root, dirs, files in os.walk(folderPath):
-            for file in files:
-                if file.lower().endswith(tuple(extensions)):
-                    relativePath = os.path.join(root, file)
-                    images.append(relativePath)
-        images.sort(key=lambda x: x.lower())
-        return images
+    def onImagesFound(self, scan_id, paths):
+        """扫描中途发现的图像，加入列表；第一批到达时即打开第一张"""
+        if scan_id != self._scanId:
+            return
+        pattern = self._scanPattern
+        self.imageList.extend(p for p in paths if not pattern or pattern in p)  # 加载新文件夹中的图像
+        # 每次扫描只主动打开一次，第一张无法读取时不再反复打开（弹出错误框）
+        if self.filename is None and self._scanOpened != scan_id and self.imageList:
+            self._scanOpened = scan_id
+            self.openNextImg(load=self._scanLoad)
+
+    def onScanFinished(self, scan_id, paths):
+        """扫描完成：换成排序后的完整列表（去掉已删除的图像）"""
+        if scan_id != self._scanId:
+            return
+        self._scanId = None
+        pattern = self._scanPattern
+        self.imageList = [p for p in paths if not pattern or pattern in p]
+        removed = self.filename is not None and self.filename not in self.imageList
+        if removed:
+            self.filename = None
+        if self.filename is None and (removed or self._scanOpened != scan_id):
+            self._scanOpened = scan_id
+            self.openNextImg(load=self._scanLoad)
+        self.status(
+            f"共 {len(self.imageList)} 张图像，扫描用时 {time.perf_counter() - self._scanStart:.1f}s"
+        )
 
     def toggleDrawingSensitive(self, drawing=True):
         """Toggle drawing sensitive.
@@ -1585,6 +1760,14 @@ class MainWindow(QMainWindow):
     def setEditMode(self):
         self.toggleDrawMode(True)
 
+    def setDirty(self):
+        self.dirty = True
+        self.actions.save.setEnabled(True)
+        title = __appname__
+        if self.filename is not None:
+            title = "{} - {}*".format(title, self.filename)
+        self.setWindowTitle(title)
+
     def setClean(self):
         self.dirty = False
         self.actions.save.setEnabled(False)
@@ -0,0 +1,139 @@
+# -*- coding:utf-8 -*-
+"""
+无界面批量OCR：遍历目录中的图像，每识别完一张就输出一条 JSON 结果
+
+python main.py batch <dir> --lang ch --workers N --out results/
+"""
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+
+from .logger import logger
+from . import utils
+from .utils.ocr_farm import OCRProcessFarm
+from .utils.ocr_cache import OCRResultCache
+from .utils.dir_scan import supported_extensions
+from .utils.ocr_utils import DEFAULT_PIPELINE, create_engine, to_engine_image
+
+
+class BatchRunner(object):
+    """批量识别
+
+    backend="thread": 每个工作线程持有独立的 PaddleOCR 实例；
+    backend="process": 工作线程只负责解码，推理交给 OCRProcessFarm 子进程。
+    """
+
+    def __init__(self, lang="ch", workers=1, out_dir="results", use_angle=True, backend="thread", cache=None):
+        self.lang = lang
+        self.workers = max(1, int(workers))
+        self.out_dir = out_dir
+        self.use_angle = use_angle
+        self.backend = backend
+        self.farm = None
+        if backend == "process":
+            self.farm = OCRProcessFarm(self.workers, lang, use_angle)
+        self.cache = cache
+        self._local = threading.local()
+
+    def _engine(self):
+        # PaddleOCR 实例不是线程安全的，每个线程各自加载一份
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            engine = create_engine(self.lang, self.use_angle, **DEFAULT_PIPELINE)
+            self._local.engine = engine
+        return engine
+
+    def process(self, img_path):
+        t0 = time.perf_counter()
+        record = {"image": img_path, "lang": self.lang}
+        try:
+            image = utils.img_file_to_arr(img_path)
+            key = cached = None
+            if self.cache is not None:
+                key = self.cache.makeKey(image, self.lang, self.use_angle, DEFAULT_PIPELINE)
+                cached = self.cache.get(key)
+            if cached is not None:
+                record.update(cached)
+                record["cached"] = True
+            else:
+                if self.farm is not None:
+                    result = self.farm.submit(image).result()
+                else:
+                    result = utils.ocr_result_to_dict(
+                        utils.run_ocr(self._engine(), to_engine_image(image))
+                    )
+                if key is not None:
+                    self.cache.put(key, result)
+                record.update(result)
+        except Exception as e:
+            logger.error("OCR failed for {}: {}".format(img_path, e))
+            record["error"] = str(e)
+        record["elapsed"] = round(time.perf_counter() - t0, 4)
+        return record
+
+    def output_path(self, root, img_path):
+        # 保留原扩展名，同目录下的 a.jpg 与 a.png 不会写到同一个文件
+        rel = os.path.relpath(img_path, root)
+        return os.path.join(self.out_dir, rel + ".json")
+
+    def save(self, root, record):
+        path = self.output_path(root, record["image"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+
+    def run(self, root, images, stream=sys.stdout):
+        """识别 images，按完成顺序把结果写入 out_dir 并逐行输出到 stream"""
+        n_done = n_failed = 0
+        t0 = time.perf_counter()
+        images = iter(images)
+        # 限制排队任务数，避免一次性为几万张图创建 future
+        max_pending = self.workers * 2
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as executor:
+            pending = set()
+            for img_path in images:
+                pending.add(executor.submit(self.process, img_path))
+                if len(pending) >= max_pending:
+                    break
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    record = future.result()
+                    self.save(root, record)
+                    stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    stream.flush()
+                    n_done += 1
+                    n_failed += "error" in record
+                    img_path = next(images, None)
+                    if img_path is not None:
+                        pending.add(executor.submit(self.process, img_path))
+        if self.farm is not None:
+            self.farm.shutdown()
+        logger.info(
+            "Batch finished: {} images ({} failed) in {:.1f}s".format(
+                n_done, n_failed, time.perf_counter() - t0
+            )
+        )
+        return n_done, n_failed
+
+
+def run_batch(dirpath, lang="ch", workers=1, out_dir="results", pattern=None, backend="thread", cache_config=None):
+    images = [
+        filename
+        for filename in utils.scan_all_images(dirpath, supported_extensions())
+        if not pattern or pattern in filename
+    ]
+    logger.info("Found {} images in {}".format(len(images), dirpath))
+    cache = None
+    if cache_config and cache_config.get("enabled"):
+        cache = OCRResultCache(cache_config.get("dir"), cache_config.get("max_mb"))
+    runner = BatchRunner(
+        lang=lang, workers=workers, out_dir=out_dir, backend=backend, cache=cache
+    )
+    _, n_failed = runner.run(dirpath, images)
+    return 1 if n_failed else 0
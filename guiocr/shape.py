@@ -7,10 +7,6 @@ from PyQt5 import QtGui
 from guiocr import utils
 
 
-# TODO(unknown):
-# - [opt] Store paths instead of creating new ones at each paint.
-
-
 DEFAULT_LINE_COLOR = QtGui.QColor(0, 255, 0, 128)  # bf hovering
 DEFAULT_FILL_COLOR = QtGui.QColor(0, 255, 0, 128)  # hovering
 DEFAULT_SELECT_LINE_COLOR = QtGui.QColor(255, 255, 255)  # selected
@@ -54,6 +50,7 @@ class Shape(object):
     ):
         self.label = label
         self.group_id = group_id
+        self._pathCache = {}
         self.points = []
         self.fill = False
         self.selected = False
@@ -78,6 +75,25 @@ class Shape(object):
 
         self.shape_type = shape_type
 
+    @property
+    def points(self):
+        return self._points
+
+    @points.setter
+    def points(self, value):
+        self._points = list(value)
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop cached paths; called whenever the geometry changes."""
+        self._pathCache = {}
+
+    def __getstate__(self):
+        # QPainterPath caches are not copyable; rebuild them lazily.
+        state = self.__dict__.copy()
+        state["_pathCache"] = {}
+        return state
+
     @property
     def shape_type(self):
         return self._shape_type
@@ -96,35 +112,42 @@ class Shape(object):
         ]:
             raise ValueError("Unexpected shape_type: {}".format(value))
         self._shape_type = value
+        self.invalidate()
 
     def close(self):
         self._closed = True
+        self.invalidate()
 
     def addPoint(self, point):
         if self.points and point == self.points[0]:
             self.close()
         else:
             self.points.append(point)
+            self.invalidate()
 
     def canAddPoint(self):
         return self.shape_type in ["polygon", "linestrip"]
 
     def popPoint(self):
         if self.points:
+            self.invalidate()
             return self.points.pop()
         return None
 
     def insertPoint(self, i, point):
         self.points.insert(i, point)
+        self.invalidate()
 
     def removePoint(self, i):
         self.points.pop(i)
+        self.invalidate()
 
     def isClosed(self):
         return self._closed
 
     def setOpen(self):
         self._closed = False
+        self.invalidate()
 
     def getRectFromLine(self, pt1, pt2):
         x1, y1 = pt1.x(), pt1.y()
@@ -141,40 +164,12 @@ class Shape(object):
             pen.setWidth(max(1, int(round(2.0 / self.scale))))
             painter.setPen(pen)
 
-            line_path = QtGui.QPainterPath()
-            vrtx_path = QtGui.QPainterPath()
-
-            if self.shape_type == "rectangle":
-                assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    rectangle = self.getRectFromLine(*self.points)
-                    line_path.addRect(rectangle)
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "circle":
-                assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    rectangle = self.getCircleRectFromLine(self.points)
-                    line_path.addEllipse(rectangle)
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "linestrip":
-                line_path.moveTo(self.points[0])
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(p)
-                    self.drawVertex(vrtx_path, i)
+            line_path = self.linePath()
+            vrtx_path = self.vertexPath()
+            if self._highlightIndex is not None:
+                self._vertex_fill_color = self.hvertex_fill_color
             else:
-                line_path.moveTo(self.points[0])
-                # Uncommenting the following line will draw 2 paths
-                # for the 1st vertex, and make it non-filled, which
-                # may be desirable.
-                # self.drawVertex(vrtx_path, 0)
-
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(p)
-                    self.drawVertex(vrtx_path, i)
-                if self.isClosed():
-                    line_path.lineTo(self.points[0])
+                self._vertex_fill_color = self.vertex_fill_color
 
             painter.drawPath(line_path)
             painter.drawPath(vrtx_path)
@@ -187,6 +182,47 @@ class Shape(object):
                 )
                 painter.fillPath(line_path, color)
 
+    def linePath(self):
+        """Outline path, cached until the points change."""
+        path = self._pathCache.get("line")
+        if path is not None:
+            return path
+        path = QtGui.QPainterPath()
+        if self.shape_type == "rectangle":
+            assert len(self.points) in [1, 2]
+            if len(self.points) == 2:
+                rectangle = self.getRectFromLine(*self.points)
+                path.addRect(rectangle)
+        elif self.shape_type == "circle":
+            assert len(self.points) in [1, 2]
+            if len(self.points) == 2:
+                rectangle = self.getCircleRectFromLine(self.points)
+                path.addEllipse(rectangle)
+        else:
+            path.moveTo(self.points[0])
+            for p in self.points:
+                path.lineTo(p)
+            if self.shape_type != "linestrip" and self.isClosed():
+                path.lineTo(self.points[0])
+        self._pathCache["line"] = path
+        return path
+
+    def vertexPath(self):
+        """Vertex markers path, cached per scale and highlight state."""
+        key = ("vertex", self.scale, self._highlightIndex, self._highlightMode)
+        path = self._pathCache.get(key)
+        if path is not None:
+            return path
+        path = QtGui.QPainterPath()
+        for i in range(len(self.points)):
+            self.drawVertex(path, i)
+        # keep only the current variant
+        self._pathCache = {
+            k: v for k, v in self._pathCache.items() if not isinstance(k, tuple)
+        }
+        self._pathCache[key] = path
+        return path
+
     def drawVertex(self, path, i):
         d = self.point_size / self.scale
         shape = self.point_type
@@ -240,6 +276,13 @@ class Shape(object):
         return rectangle
 
     def makePath(self):
+        path = self._pathCache.get("shape")
+        if path is None:
+            path = self._makePath()
+            self._pathCache["shape"] = path
+        return path
+
+    def _makePath(self):
         if self.shape_type == "rectangle":
             path = QtGui.QPainterPath()
             if len(self.points) == 2:
@@ -257,13 +300,21 @@ class Shape(object):
         return path
 
     def boundingRect(self):
-        return self.makePath().boundingRect()
+        rect = self._pathCache.get("bounds")
+        if rect is None:
+            rect = self.makePath().boundingRect()
+            if rect.isNull() and self.points:
+                # a path made of a single point has no extent
+                rect = QtCore.QRectF(self.points[0], self.points[0])
+            self._pathCache["bounds"] = rect
+        return rect
 
     def moveBy(self, offset):
         self.points = [p + offset for p in self.points]
 
     def moveVertexBy(self, i, offset):
         self.points[i] = self.points[i] + offset
+        self.invalidate()
 
     def highlightVertex(self, i, action):
         """Highlight a vertex appropriately based on the current action
@@ -291,3 +342,4 @@ class Shape(object):
 
     def __setitem__(self, key, value):
         self.points[key] = value
+        self.invalidate()
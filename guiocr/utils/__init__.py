@@ -1,14 +1,17 @@
 # flake8: noqa
 
 from ._io import lblsave
+from ._io import scan_all_images
 
 from .image import apply_exif_orientation
 from .image import img_arr_to_b64
 from .image import img_b64_to_arr
 from .image import img_data_to_arr
+from .image import img_file_to_arr
 from .image import img_data_to_pil
 from .image import img_data_to_png_data
 from .image import img_pil_to_data
+from .image import load_image_file
 
 from .shape import labelme_shapes_to_label
 from .shape import masks_to_bboxes
@@ -16,14 +19,29 @@ from .shape import polygons_to_mask
 from .shape import shape_to_mask
 from .shape import shapes_to_label
 
+from .qt import img_arr_to_qimage
 from .qt import newIcon
 from .qt import newButton
 from .qt import newAction
 from .qt import addActions
 from .qt import labelValidator
+from .qt import rowsToSelection
+from .qt import selectRows
 from .qt import struct
 from .qt import distance
 from .qt import distancetoline
 from .qt import fmtShortcut
 
 from .ocr_utils import OCR_qt
+from .ocr_utils import normalize_ocr_result
+from .ocr_utils import ocr_result_to_dict
+from .ocr_utils import run_ocr
+
+from .result_store import OCRResultStore
+
+from .prefetch import ImagePrefetcher
+from .image_cache import ImageCache
+from .image_cache import file_stamp
+from .dir_scan import DirectoryIndex
+from .dir_scan import DirectoryScanner
+from .dir_scan import supported_extensions
@@ -1,3 +1,4 @@
+import os
 import os.path as osp
 
 import numpy as np
@@ -21,3 +22,16 @@ def lblsave(filename, lbl):
             "[%s] Cannot save the pixel-wise class label as PNG. "
             "Please consider using the .npy format." % filename
         )
+
+
+def scan_all_images(folderPath, extensions):
+    """递归查找目录下扩展名在 extensions 中的图像，按路径排序"""
+    extensions = tuple(ext.lower() for ext in extensions)
+    images = []
+    for root, dirs, files in os.walk(folderPath):
+        for file in files:
+            if file.lower().endswith(extensions):
+                relativePath = os.path.join(root, file)
+                images.append(relativePath)
+    images.sort(key=lambda x: x.lower())
+    return images
@@ -0,0 +1,261 @@
+# -*- coding:utf-8 -*-
+"""
+后台增量扫描图像目录
+
+用 os.scandir 逐个目录遍历，边扫描边分批给出图像路径。每个根目录的扫描
+结果（各目录的 mtime 及其中图像的大小、mtime）保存为磁盘索引；再次打开
+时先直接给出索引中的图像，之后只重新读取 mtime 发生变化的目录，其余目录
+只重新 stat 索引中的图像，更新被就地改写的文件。
+"""
+import functools
+import hashlib
+import json
+import os
+import os.path as osp
+import threading
+import time
+
+from ..logger import logger
+
+
+INDEX_VERSION = 1
+
+
+def default_index_dir():
+    return osp.join(osp.expanduser("~"), ".cache", "guiocr", "dirindex")
+
+
+@functools.lru_cache(maxsize=1)
+def supported_extensions():
+    """Qt 可读取的图像扩展名，只查询一次"""
+    from PyQt5 import QtGui
+
+    return tuple(
+        ".%s" % fmt.data().decode().lower()
+        for fmt in QtGui.QImageReader.supportedImageFormats()
+    )
+
+
+def _image_path(root, rel, name):
+    # 与 os.walk(root) 得到的路径形式一致
+    return osp.join(root, rel, name)
+
+
+class DirectoryIndex(object):
+    """一个根目录的扫描索引
+
+    dirs: 相对目录 -> {"mtime": 目录 mtime_ns, "files": [[文件名, 大小, mtime_ns]], "dirs": [子目录名]}
+    """
+
+    def __init__(self, root, extensions, index_dir=None):
+        self.root = root
+        self.extensions = tuple(sorted(ext.lower() for ext in extensions))
+        self.index_dir = index_dir or default_index_dir()
+        self.dirs = {}
+        # 本次扫描中大小或 mtime 与索引不同的图像
+        self.changed = []
+
+    @property
+    def path(self):
+        key = hashlib.blake2b(
+            osp.abspath(self.root).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return osp.join(self.index_dir, key + ".json")
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (
+            data.get("version") != INDEX_VERSION
+            or data.get("root") != osp.abspath(self.root)
+            or tuple(data.get("extensions", ())) != self.extensions
+        ):
+            return False
+        self.dirs = data.get("dirs", {})
+        return True
+
+    def save(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        path = self.path
+        tmp_path = "{}.{}.tmp".format(path, threading.get_ident())
+        data = dict(
+            version=INDEX_VERSION,
+            root=osp.abspath(self.root),
+            extensions=list(self.extensions),
+            dirs=self.dirs,
+        )
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def images(self):
+        """索引中的全部图像路径（未排序）"""
+        return [
+            _image_path(self.root, rel, name)
+            for rel, entry in self.dirs.items()
+            for name, _, _ in entry["files"]
+        ]
+
+    def readDir(self, rel):
+        """读取目录 rel，无法读取时返回 None
+
+        目录 mtime 未变时不再列出目录，只重新 stat 索引中的图像。
+        """
+        path = osp.join(self.root, rel)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        old = self.dirs.get(rel)
+        if old is not None and old["mtime"] == mtime:
+            entry = self._restat(path, old)
+        else:
+            entry = self._scanDir(path, mtime)
+        if entry is not None and old is not None:
+            stamps = {name: (size, mtime) for name, size, mtime in old["files"]}
+            self.changed.extend(
+                _image_path(self.root, rel, name)
+                for name, size, mtime in entry["files"]
+                if name in stamps and stamps[name] != (size, mtime)
+            )
+        return entry
+
+    def _restat(self, path, entry):
+        files = []
+        for name, _, _ in entry["files"]:
+            try:
+                st = os.stat(osp.join(path, name))
+            except OSError:
+                continue
+            files.append([name, st.st_size, st.st_mtime_ns])
+        return {"mtime": entry["mtime"], "files": files, "dirs": entry["dirs"]}
+
+    def _scanDir(self, path, mtime):
+        files, dirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    try:
+                        # 与 os.walk 相同，不进入指向目录的符号链接
+                        if e.is_dir(follow_symlinks=False):
+                            dirs.append(e.name)
+                        elif e.name.lower().endswith(self.extensions):
+                            st = e.stat()
+                            files.append([e.name, st.st_size, st.st_mtime_ns])
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return {"mtime": mtime, "files": files, "dirs": dirs}
+
+
+class DirectoryScanner(object):
+    """在后台线程中扫描目录，start() 会中止上一次扫描
+
+    on_found(scan_id, paths) 分批给出新发现的图像路径，
+    on_finished(scan_id, paths) 给出按路径排序的完整列表；均在后台线程中调用。
+    """
+
+    def __init__(self, on_found=None, on_finished=None, index_dir=None, use_index=True, batch_interval=0.2):
+        self.on_found = on_found
+        self.on_finished = on_finished
+        self.index_dir = index_dir
+        self.use_index = use_index
+        self.batch_interval = batch_interval
+        self._scanId = 0
+        self._stop = None
+        self._lock = threading.Lock()
+
+    def start(self, root, extensions=None):
+        """开始扫描 root，返回本次扫描的编号"""
+        if extensions is None:
+            extensions = supported_extensions()
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+            self._scanId += 1
+            scan_id = self._scanId
+            stop = self._stop = threading.Event()
+        thread = threading.Thread(
+            target=self._run,
+            args=(scan_id, root, extensions, stop),
+            name="dirscan",
+            daemon=True,
+        )
+        thread.start()
+        return scan_id
+
+    def cancel(self):
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+                self._stop = None
+
+    def _run(self, scan_id, root, extensions, stop):
+        t0 = time.perf_counter()
+        try:
+            images = self._scan(scan_id, root, extensions, stop)
+        except Exception as e:
+            logger.error("Failed to scan {}: {}".format(root, e))
+            images = None
+        if images is None or stop.is_set():
+            return
+        logger.info(
+            "Scanned {}: {} images in {:.2f}s".format(root, len(images), time.perf_counter() - t0)
+        )
+        if self.on_finished is not None:
+            self.on_finished(scan_id, images)
+
+    def _emit(self, scan_id, paths, stop):
+        if paths and self.on_found is not None and not stop.is_set():
+            self.on_found(scan_id, paths)
+
+    def _scan(self, scan_id, root, extensions, stop):
+        index = DirectoryIndex(root, extensions, self.index_dir)
+        known = set()
+        if self.use_index and index.load():
+            # 先给出上次的结果，随后只补充新出现的图像
+            known = set(index.images())
+            self._emit(scan_id, sorted(known, key=lambda x: x.lower()), stop)
+
+        dirs = {}
+        pending = []
+        last_emit = time.monotonic()
+        stack = [""]
+        while stack:
+            if stop.is_set():
+                return None
+            rel = stack.pop()
+            entry = index.readDir(rel)
+            if entry is None:
+                continue
+            dirs[rel] = entry
+            for name, _, _ in sorted(entry["files"], key=lambda f: f[0].lower()):
+                path = _image_path(root, rel, name)
+                if path not in known:
+                    pending.append(path)
+            # 深度优先，按名称顺序访问子目录
+            stack.extend(
+                osp.join(rel, name)
+                for name in sorted(entry["dirs"], key=str.lower, reverse=True)
+            )
+            if pending and time.monotonic() - last_emit >= self.batch_interval:
+                self._emit(scan_id, pending, stop)
+                pending = []
+                last_emit = time.monotonic()
+        self._emit(scan_id, pending, stop)
+
+        index.dirs = dirs
+        if index.changed:
+            logger.info("{} images changed since the last scan of {}".format(len(index.changed), root))
+        if self.use_index:
+            try:
+                index.save()
+            except OSError as e:
+                logger.warning("Failed to save directory index for {}: {}".format(root, e))
+        images = index.images()
+        images.sort(key=lambda x: x.lower())
+        return images
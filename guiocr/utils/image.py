@@ -20,6 +20,26 @@ def img_data_to_arr(img_data):
     return img_arr
 
 
+def img_file_to_arr(filename):
+    """读取图像文件为 RGB ndarray，并按 EXIF 方向旋转"""
+    img_pil = apply_exif_orientation(PIL.Image.open(filename))
+    if img_pil.mode != "RGB":
+        img_pil = img_pil.convert("RGB")
+    return np.asarray(img_pil)
+
+
+def load_image_file(filename):
+    """读取图像文件为只读 RGB ndarray，并按 EXIF 方向旋转
+
+    画布、亮度/对比度调整和OCR共享这一份像素，不再编码为 JPEG/PNG。
+    """
+    img_arr = img_file_to_arr(filename)
+    if not img_arr.flags.c_contiguous:
+        img_arr = np.ascontiguousarray(img_arr)
+    img_arr.setflags(write=False)
+    return img_arr
+
+
 def img_b64_to_arr(img_b64):
     img_data = base64.b64decode(img_b64)
     img_arr = img_data_to_arr(img_data)
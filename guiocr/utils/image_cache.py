@@ -0,0 +1,76 @@
+# -*- coding:utf-8 -*-
+"""
+已解码图像的内存缓存
+
+按路径缓存 RGB 像素、画布 QPixmap 及各语言的OCR结果，
+文件的修改时间或大小变化后条目失效；总字节数超出预算时按 LRU 淘汰。
+"""
+import os
+
+from .lru_cache import LRUCache
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class CachedImage(object):
+    __slots__ = ("stamp", "image", "pixmap", "results")
+
+    def __init__(self, stamp, image):
+        self.stamp = stamp
+        self.image = image
+        self.pixmap = None
+        self.results = {}  # lan -> OCR result
+
+    def cost(self):
+        cost = self.image.nbytes
+        if self.pixmap is not None:
+            cost += self.pixmap.width() * self.pixmap.height() * self.pixmap.depth() // 8
+        return cost
+
+
+class ImageCache(object):
+    def __init__(self, max_mb=1024):
+        self._lru = LRUCache(max_cost=int(max_mb * 1024 * 1024) if max_mb else None)
+
+    def __contains__(self, path):
+        return path in self._lru
+
+    def get(self, path):
+        """返回仍然有效的 CachedImage，文件已变化时删除条目并返回 None"""
+        entry = self._lru.get(path)
+        if entry is not None and entry.stamp != file_stamp(path):
+            self._lru.pop(path)
+            entry = None
+        return entry
+
+    def put(self, path, image, stamp=None):
+        entry = CachedImage(stamp or file_stamp(path), image)
+        self._lru.put(path, entry, cost=entry.cost())
+        return entry
+
+    def setPixmap(self, path, pixmap):
+        entry = self._lru.get(path)
+        if entry is not None:
+            entry.pixmap = pixmap
+            # 重新放入以更新占用字节数
+            self._lru.put(path, entry, cost=entry.cost())
+
+    def setResult(self, path, lan, result):
+        entry = self._lru.get(path)
+        if entry is not None:
+            entry.results[lan] = result
+
+    def result(self, path, lan):
+        entry = self._lru.get(path)
+        if entry is None:
+            return None
+        return entry.results.get(lan)
+
+    def clear(self):
+        self._lru.clear()
@@ -0,0 +1,81 @@
+import collections
+import threading
+
+
+class LRUCache(object):
+    """Least-recently-used mapping bounded by entry count and/or total cost.
+
+    Each entry carries a caller supplied ``cost`` (bytes, MB, ...). When
+    ``max_items`` or ``max_cost`` is exceeded the oldest entries are evicted
+    and passed to ``on_evict(key, value)``. The most recently inserted entry
+    is never evicted, so a single oversized value is still kept.
+    """
+
+    def __init__(self, max_items=None, max_cost=None, on_evict=None):
+        self.max_items = max_items
+        self.max_cost = max_cost
+        self.on_evict = on_evict
+        self._data = collections.OrderedDict()  # key -> (value, cost)
+        self._total_cost = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    @property
+    def total_cost(self):
+        return self._total_cost
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value, cost=0):
+        with self._lock:
+            if key in self._data:
+                self._total_cost -= self._data.pop(key)[1]
+            self._data[key] = (value, cost)
+            self._total_cost += cost
+            evicted = self._shrink()
+        for k, v in evicted:
+            if self.on_evict is not None:
+                self.on_evict(k, v)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            value, cost = self._data.pop(key)
+            self._total_cost -= cost
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._total_cost = 0
+
+    def _overBudget(self):
+        if self.max_items is not None and len(self._data) > self.max_items:
+            return True
+        if self.max_cost is not None and self._total_cost > self.max_cost:
+            return True
+        return False
+
+    def _shrink(self):
+        evicted = []
+        while len(self._data) > 1 and self._overBudget():
+            key, (value, cost) = self._data.popitem(last=False)
+            self._total_cost -= cost
+            evicted.append((key, value))
+        return evicted
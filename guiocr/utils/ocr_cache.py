@@ -0,0 +1,141 @@
+# -*- coding:utf-8 -*-
+"""
+OCR结果的磁盘缓存
+
+键为解码后像素内容与语言/模型版本/流水线参数的哈希，值为
+ocr_result_to_dict 格式的 JSON。总大小超出上限时删除最久未使用的条目。
+"""
+import hashlib
+import json
+import os
+import os.path as osp
+import threading
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:
+    importlib_metadata = None
+
+import numpy as np
+
+from ..logger import logger
+
+
+def default_cache_dir():
+    return osp.join(osp.expanduser("~"), ".cache", "guiocr", "ocr")
+
+
+def _paddleocr_version():
+    # 不导入 paddleocr 本身，避免命中缓存时也要付出导入开销
+    if importlib_metadata is None:
+        return "unknown"
+    try:
+        return importlib_metadata.version("paddleocr")
+    except Exception:
+        return "unknown"
+
+
+class OCRResultCache(object):
+    def __init__(self, cache_dir=None, max_mb=512):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        self._version = _paddleocr_version()
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def makeKey(self, image, lang="ch", use_angle=True, pipeline=None, extra=None):
+        """image 为解码后的 ndarray；extra 用于区分分块等额外处理参数"""
+        arr = np.ascontiguousarray(image)
+        params = dict(
+            lang=lang,
+            use_angle=bool(use_angle),
+            pipeline=pipeline or {},
+            extra=extra or {},
+            version=self._version,
+        )
+        h = hashlib.blake2b(digest_size=20)
+        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        h.update(str((arr.shape, arr.dtype.str)).encode("utf-8"))
+        h.update(memoryview(arr).cast("B"))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return osp.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            # 更新访问时间，淘汰时按 mtime 近似 LRU
+            os.utime(path, None)
+        except OSError:
+            pass
+        return record
+
+    def put(self, key, record):
+        path = self._path(key)
+        os.makedirs(osp.dirname(path), exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(path, threading.get_ident())
+        data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            # 覆盖已有条目时先扣除旧文件的大小
+            try:
+                old_size = os.stat(path).st_size
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+            if self._size is None:
+                self._size = sum(size for _, _, size in self._entries())
+            else:
+                self._size += len(data) - old_size
+            if self.max_bytes is not None and self._size > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def _entries(self):
+        entries = []
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, st.st_mtime, st.st_size))
+        return entries
+
+    def _evict(self):
+        # 淘汰到上限的 90%，避免每次写入都扫描目录
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        size = sum(e[2] for e in entries)
+        n_removed = 0
+        for path, _, entry_size in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            n_removed += 1
+        self._size = size
+        logger.info("OCR cache evicted {} entries ({} bytes left)".format(n_removed, size))
@@ -0,0 +1,107 @@
+# -*- coding:utf-8 -*-
+"""
+多进程OCR：每个子进程持有一个 PaddleOCR 实例，图像通过共享内存传递
+
+预处理/后处理受 GIL 限制，单进程只能用满一个核；子进程之间互不影响。
+"""
+import concurrent.futures
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..logger import logger
+from .ocr_utils import DEFAULT_PIPELINE
+from .ocr_utils import create_engine
+from .ocr_utils import ocr_result_to_dict
+from .ocr_utils import run_ocr
+from .ocr_utils import to_engine_image
+from .ocr_utils import warmup_image
+
+
+# 子进程内的 PaddleOCR 实例
+_engine = None
+
+
+def _init_worker(lang, use_angle, pipeline):
+    global _engine
+    _engine = create_engine(lang, use_angle, **pipeline)
+
+
+def _run_shared(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # 转成 BGR 时已复制一份，随后即可关闭共享内存
+        img = to_engine_image(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+    finally:
+        shm.close()
+    return ocr_result_to_dict(run_ocr(_engine, img))
+
+
+def _release(shm):
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class OCRProcessFarm(object):
+    """进程池OCR后端
+
+    submit() 返回 concurrent.futures.Future，结果为 ocr_result_to_dict 的
+    字典；map() 按输入顺序返回结果。
+    """
+
+    def __init__(self, workers=2, lang="ch", use_angle=True, pipeline=None):
+        options = dict(DEFAULT_PIPELINE)
+        options.update(pipeline or {})
+        self.workers = max(1, int(workers))
+        self.lang = lang
+        self.use_angle = use_angle
+        # paddle 不支持 fork 后继续使用，统一用 spawn
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(lang, use_angle, options),
+        )
+        logger.info("OCR process farm started: {} workers ({})".format(self.workers, lang))
+
+    def submit(self, image):
+        """image 为 RGB/RGBA/灰度 ndarray"""
+        arr = np.asarray(image)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        try:
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            future = self._executor.submit(_run_shared, shm.name, arr.shape, arr.dtype.str)
+        except Exception:
+            _release(shm)
+            raise
+        future.add_done_callback(lambda f: _release(shm))
+        return future
+
+    def map(self, images, window=None):
+        """按输入顺序逐个返回结果，同时最多有 window 张图在共享内存中"""
+        window = window or self.workers * 2
+        futures = []
+        images = iter(images)
+        for image in images:
+            futures.append(self.submit(image))
+            if len(futures) >= window:
+                break
+        while futures:
+            future = futures.pop(0)
+            image = next(images, None)
+            if image is not None:
+                futures.append(self.submit(image))
+            yield future.result()
+
+    def warmup(self):
+        """让每个子进程都完成模型加载和一次推理"""
+        image = warmup_image()
+        for future in [self.submit(image) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
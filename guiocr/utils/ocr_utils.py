@@ -9,115 +9,768 @@ Created time:2021/12/1 20:33
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QPixmap, QImage
 
-from paddleocr import PaddleOCR
-# 兼容不同 paddleocr 版本：有些版本未在顶级导出 draw_ocr 等函数
-try:
-    from paddleocr import draw_ocr
-except Exception:
-    draw_ocr = None
+# 显示结果
+from PIL import Image, ImageDraw, ImageFont
+import concurrent.futures
+import gc
+import heapq
+import itertools
+import os
+import threading
+import time
+
+import numpy as np
 
 try:
-    from paddleocr import PPStructure, draw_structure_result, save_structure_res
+    import psutil
 except Exception:
-    PPStructure = None
+    psutil = None
+
+from ..logger import logger
+from .image import img_file_to_arr
+from .lru_cache import LRUCache
+from .ocr_cache import OCRResultCache
+from .tiling import run_tiled
+from .tiling import tile_grid
+
+
+_paddleocr = None
+_paddleocr_lock = threading.Lock()
+
+
+def import_paddleocr():
+    """首次使用时才导入 paddleocr（连带 paddle），避免拖慢界面启动"""
+    global _paddleocr
+    with _paddleocr_lock:
+        if _paddleocr is None:
+            t0 = time.perf_counter()
+            import paddleocr
+            _paddleocr = paddleocr
+            logger.info("paddleocr imported in {:.2f}s".format(time.perf_counter() - t0))
+    return _paddleocr
+
+
+def _draw_ocr():
+    # 兼容不同 paddleocr 版本：有些版本未在顶级导出 draw_ocr 等函数
+    return getattr(import_paddleocr(), "draw_ocr", None)
+
+
+# 默认的 PaddleOCR 流水线参数
+# 禁用文档预处理功能，避免加载 PP-LCNet_x1_0_doc_ori 模型
+DEFAULT_PIPELINE = dict(
+    use_doc_orientation_classify=False,
+    use_doc_unwarping=False,
+)
+
+
+def _process_rss_mb():
+    """当前进程常驻内存(MB)，未安装 psutil 时返回 None"""
+    if psutil is None:
+        return None
     try:
-        from paddleocr.ppstructure import draw_structure_result, save_structure_res
+        return psutil.Process(os.getpid()).memory_info().rss / (1024.0 * 1024.0)
     except Exception:
-        draw_structure_result = None
-        save_structure_res = None
+        return None
 
-# 显示结果
-from PIL import Image, ImageDraw, ImageFont
-import os
+
+def create_engine(lan="ch", use_angle=True, **pipeline):
+    """构造一个 PaddleOCR 实例，自动剔除当前版本不支持的参数"""
+    logger.info("加载模型......")
+    # Only pass explicit model dirs if they exist and look complete;
+    # otherwise let PaddleOCR handle downloading / locating models itself.
+    det_dir = f"models/det/{lan}"
+    rec_dir = f"models/cls/{lan}"
+
+    if not (os.path.isdir(det_dir) and os.path.exists(os.path.join(det_dir, "inference.yml"))):
+        logger.debug(f"PaddleOCR: model directory '{det_dir}' missing or incomplete; will not pass det_model_dir (PaddleOCR may download models).")
+    if not (os.path.isdir(rec_dir) and os.path.exists(os.path.join(rec_dir, "inference.yml"))):
+        logger.debug(f"PaddleOCR: model directory '{rec_dir}' missing or incomplete; will not pass rec_model_dir (PaddleOCR may download models).")
+
+    # 只传递 PaddleOCR 3.x 推荐参数，自动下载模型
+    params = dict(use_angle_cls=use_angle, lang=lan)
+    params.update(pipeline)
+    # 不再传递 det_model_dir、rec_model_dir，完全自动下载
+
+    # Try to initialize PaddleOCR; if it complains about unknown args, remove them and retry
+    while True:
+        try:
+            engine = import_paddleocr().PaddleOCR(**params)
+            break
+        except ValueError as e:
+            msg = str(e)
+            if "Unknown argument:" in msg:
+                name = msg.split("Unknown argument:")[-1].strip()
+                if name in params:
+                    logger.warning(f"PaddleOCR: removing unsupported argument '{name}' and retrying...")
+                    params.pop(name, None)
+                    continue
+            # re-raise if it's not an unknown-argument error we can handle
+            raise
+
+    logger.info("模型加载完成......")
+    return engine
+
+
+class EnginePool(object):
+    """按 (语言, 方向分类器, 流水线参数) 缓存已加载的 PaddleOCR 实例
+
+    超出 ``max_engines`` 个数或 ``memory_budget_mb`` 内存预算时按 LRU 淘汰，
+    来回切换语言时无需重新加载模型。每个实例的内存占用通过加载前后的进程
+    RSS 差值估算（需要 psutil，否则只按个数限制）。
+    """
+
+    def __init__(self, max_engines=3, memory_budget_mb=None):
+        self._engines = LRUCache(
+            max_items=max_engines,
+            max_cost=memory_budget_mb,
+            on_evict=self._onEvict,
+        )
+        self._loadLock = threading.Lock()
+
+    @staticmethod
+    def makeKey(lan="ch", use_angle=True, **pipeline):
+        options = dict(DEFAULT_PIPELINE)
+        options.update(pipeline)
+        return (lan, bool(use_angle), tuple(sorted(options.items())))
+
+    def __contains__(self, key):
+        return key in self._engines
+
+    def __len__(self):
+        return len(self._engines)
+
+    def has(self, lan="ch", use_angle=True, **pipeline):
+        return self.makeKey(lan, use_angle, **pipeline) in self._engines
+
+    def get(self, lan="ch", use_angle=True, **pipeline):
+        key = self.makeKey(lan, use_angle, **pipeline)
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+
+        with self._loadLock:
+            # 其他线程可能已经加载完成
+            engine = self._engines.get(key)
+            if engine is not None:
+                return engine
+            rss_before = _process_rss_mb()
+            engine = create_engine(key[0], key[1], **dict(key[2]))
+            rss_after = _process_rss_mb()
+            cost = 0
+            if rss_before is not None and rss_after is not None:
+                cost = max(0.0, rss_after - rss_before)
+            self._engines.put(key, engine, cost=cost)
+            logger.info(
+                "Engine loaded: {} ({:.0f} MB, pool {:.0f} MB / {} engines)".format(
+                    key[:2], cost, self._engines.total_cost, len(self._engines)
+                )
+            )
+        return engine
+
+    def clear(self):
+        self._engines.clear()
+        gc.collect()
+
+    def _onEvict(self, key, engine):
+        logger.info("Engine evicted: {}".format(key[:2]))
+        del engine
+        gc.collect()
+
+
+def to_engine_image(arr):
+    """RGB/RGBA/灰度 ndarray 转为 PaddleOCR 需要的连续 BGR ndarray"""
+    if arr.ndim == 2:
+        arr = np.stack([arr] * 3, axis=-1)
+    elif arr.shape[2] == 4:
+        arr = arr[:, :, :3]
+    return np.ascontiguousarray(arr[:, :, ::-1])
+
+
+def run_ocr(engine, img):
+    """对图像路径或 BGR ndarray 执行一次检测+识别"""
+    # PaddleOCR.predict no longer accepts 'cls' keyword in newer versions;
+    # call without it to avoid TypeError
+    return engine.ocr(img)
+
+
+def _module_model(engine, kind):
+    """PaddleOCR 3.x：与 engine 使用同一模型的单独检测("det")/识别("rec")模块
+
+    按需创建并挂在 engine 上；当前 paddleocr 不提供时返回 None。
+    """
+    models = getattr(engine, "_guiocr_modules", None)
+    if models is None:
+        models = {}
+        engine._guiocr_modules = models
+    if kind not in models:
+        paddleocr = import_paddleocr()
+        cls_name, param = {
+            "det": ("TextDetection", "text_detection_model_name"),
+            "rec": ("TextRecognition", "text_recognition_model_name"),
+        }[kind]
+        cls = getattr(paddleocr, cls_name, None)
+        model = None
+        if cls is not None:
+            # 沿用 PaddleOCR 按语言选定的模型，取不到时用模块默认模型
+            model_name = (getattr(engine, "_params", None) or {}).get(param)
+            model = cls(model_name=model_name) if model_name else cls()
+        models[kind] = model
+    return models[kind]
+
+
+def run_detection(engine, img):
+    """只做检测，返回按阅读顺序排列的四点框列表；PaddleOCR 不支持时返回 None"""
+    try:
+        # PaddleOCR 2.x：rec=False 时只返回检测框
+        result = engine.ocr(img, rec=False)
+        boxes = result[0] if result else None
+    except TypeError:
+        # PaddleOCR 3.x 不再支持 rec 参数，改用单独的 TextDetection 模块
+        try:
+            model = _module_model(engine, "det")
+            output = list(model.predict(img)) if model is not None else None
+        except Exception as e:
+            logger.warning("Text detection module failed: {}".format(e))
+            output = None
+        if output is None:
+            logger.warning("Streaming OCR unavailable: detection-only mode is not supported")
+            return None
+        boxes = output[0]["dt_polys"] if output else None
+    boxes = [[[float(p[0]), float(p[1])] for p in box] for box in (boxes if boxes is not None else [])]
+    # 从上到下、从左到右
+    boxes.sort(key=lambda box: (box[0][1], box[0][0]))
+    return boxes
+
+
+def crop_box(img, box):
+    """按四点框透视裁剪文本行，竖排文字旋转为横排"""
+    import cv2
+
+    pts = np.asarray(box, dtype=np.float32)[:4]
+    w = int(max(np.linalg.norm(pts[0] - pts[1]), np.linalg.norm(pts[2] - pts[3])))
+    h = int(max(np.linalg.norm(pts[0] - pts[3]), np.linalg.norm(pts[1] - pts[2])))
+    w, h = max(w, 1), max(h, 1)
+    dst = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    M = cv2.getPerspectiveTransform(pts, dst)
+    crop = cv2.warpPerspective(
+        img, M, (w, h), borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC
+    )
+    if h / float(w) >= 1.5:
+        crop = np.ascontiguousarray(np.rot90(crop))
+    return crop
+
+
+def _rec_line(entry):
+    """(text, score)，或一个小图的 [(text, score), ...] -> (text, score)"""
+    if entry and isinstance(entry[0], str):
+        return str(entry[0]), float(entry[1])
+    lines = [line for line in (entry or []) if line]
+    if not lines:
+        return "", 0.0
+    text = " ".join(str(line[0]) for line in lines)
+    return text, sum(float(line[1]) for line in lines) / len(lines)
+
+
+def run_recognition(engine, crops):
+    """只做识别（跳过检测），crops 为 BGR ndarray 列表，返回 [(text, score), ...]"""
+    if not crops:
+        return []
+    try:
+        # PaddleOCR 2.x：det=False 时对整批小图直接识别，
+        # 结果为每个小图一项，或整批放在第一项中
+        result = engine.ocr(crops, det=False)
+        entries = None
+        if result and len(result) == len(crops):
+            entries = result
+        elif result and len(result) == 1 and result[0] is not None and len(result[0]) == len(crops):
+            entries = result[0]
+        if entries is not None:
+            return [_rec_line(entry) for entry in entries]
+        logger.warning("Unexpected batched recognition result, falling back")
+    except TypeError:
+        # PaddleOCR 3.x 不再支持 det 参数，改用单独的 TextRecognition 模块
+        try:
+            model = _module_model(engine, "rec")
+            if model is not None:
+                output = list(model.predict(crops, batch_size=len(crops)))
+                if len(output) == len(crops):
+                    return [(str(res["rec_text"]), float(res["rec_score"])) for res in output]
+        except Exception as e:
+            logger.warning("Text recognition module failed, falling back: {}".format(e))
+    except Exception as e:
+        logger.warning("Batched recognition failed, falling back: {}".format(e))
+
+    # 回退：逐块完整识别，小图上的检测开销很小
+    results = []
+    for crop in crops:
+        _, txts, scores = normalize_ocr_result(run_ocr(engine, crop))
+        score = sum(scores) / len(scores) if scores else 0.0
+        results.append((" ".join(str(txt) for txt in txts), score))
+    return results
+
+
+def normalize_ocr_result(result):
+    """把不同版本 PaddleOCR 的输出统一为 (boxes, txts, scores) 三个等长列表
+
+    Supports both older PaddleOCR list-of-lines format and newer
+    dict-based document pipeline format.
+    """
+    boxes = []
+    txts = []
+    scores = []
+
+    # Normalize result which can be:
+    # - older format: result = [ [ [box, (text, score)], ... ], ... ]
+    # - newer format: result = [ { 'rec_polys': ..., 'rec_texts': ..., ... }, ... ]
+    data = None
+    if isinstance(result, list) and len(result) > 0 and isinstance(result[0], dict):
+        data = result[0]
+    elif isinstance(result, dict):
+        data = result
+    elif isinstance(result, list):
+        # older format: take first page
+        try:
+            page = result[0]
+            boxes = [line[0] for line in page]
+            txts = [line[1][0] for line in page]
+            scores = [line[1][1] for line in page]
+        except Exception:
+            boxes = []
+            txts = []
+            scores = []
+
+    if data is not None:
+        # Prefer recognized polygons and texts
+        if "rec_polys" in data and "rec_texts" in data:
+            boxes = data.get("rec_polys", [])
+            txts = data.get("rec_texts", [])
+        elif "rec_texts" in data and "rec_polys" not in data and "dt_polys" in data:
+            boxes = data.get("dt_polys", [])
+            txts = data.get("rec_texts", [])
+        elif "dt_polys" in data and "rec_texts" in data:
+            boxes = data.get("dt_polys", [])
+            txts = data.get("rec_texts", [])
+        else:
+            # best-effort fallback: try to find arrays that look like boxes/texts
+            boxes = data.get("rec_polys", data.get("dt_polys", []))
+            txts = data.get("rec_texts", [])
+        scores = data.get("rec_scores", [])
+
+    # Ensure types are list-like and lengths match
+    try:
+        boxes = list(boxes)
+    except Exception:
+        boxes = []
+    try:
+        txts = list(txts)
+    except Exception:
+        txts = []
+    try:
+        scores = [float(score) for score in scores]
+    except Exception:
+        scores = []
+
+    # Truncate to smallest length when appropriate
+    if txts:
+        n = min(len(boxes), len(txts))
+        boxes = boxes[:n]
+        txts = txts[:n]
+    else:
+        txts = [""] * len(boxes)
+    if len(scores) != len(boxes):
+        scores = (scores + [0.0] * len(boxes))[:len(boxes)]
+    return boxes, txts, scores
+
+
+def ocr_result_to_dict(result):
+    """转换为可 JSON 序列化、且可再次交给 normalize_ocr_result 的字典"""
+    boxes, txts, scores = normalize_ocr_result(result)
+    polys = []
+    for box in boxes:
+        try:
+            polys.append([[float(p[0]), float(p[1])] for p in box])
+        except Exception:
+            polys.append([])
+    return {
+        "rec_polys": polys,
+        "rec_texts": [str(txt) for txt in txts],
+        "rec_scores": scores,
+    }
+
+
+def warmup_image():
+    """生成一张带文字的小图，预热时让检测和识别都真正执行一次"""
+    image = Image.new("RGB", (320, 64), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.text((12, 24), "Warm up OCR 0123456789", fill=(0, 0, 0), font=ImageFont.load_default())
+    return np.asarray(image)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class OCRJob(object):
+    """一次整页识别任务；priority 越小越先执行"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, img_path, image=None, lan="ch", use_angle=True, priority=0, stream=True):
+        self.job_id = next(self._ids)
+        self.img_path = img_path
+        self.image = image
+        self.lan = lan
+        self.use_angle = use_angle
+        self.priority = priority
+        self.stream = stream
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def sameTask(self, img_path, lan, use_angle):
+        return (self.img_path, self.lan, self.use_angle) == (img_path, lan, use_angle)
+
+    def __repr__(self):
+        return "OCRJob({}, {})".format(self.job_id, self.img_path)
 
 
 class OCR_qt(QObject):
-    sendResult = pyqtSignal(list)
+    # 结果均带有任务号和图像路径，界面据此丢弃已离开页面的结果
+    # sendResult 同时附带在工作线程中构建好的 OCRResultStore
+    sendResult = pyqtSignal(int, str, list, object)
+    sendRegionResults = pyqtSignal(str, object, object)
+    # 流式输出：先发检测框，再按批次发识别文本 (起始序号, [(text, score), ...])
+    sendBoxes = pyqtSignal(int, str, object)
+    sendTexts = pyqtSignal(int, str, int, object)
+    sendStatus = pyqtSignal(str)
+    warmupFinished = pyqtSignal(str, float)
+    jobCancelled = pyqtSignal(int, str)
+    # 识别出错（图像无法读取、引擎异常等）：(任务号, 图像路径, 错误信息)
+    jobFailed = pyqtSignal(int, str, str)
+    regionsFailed = pyqtSignal(str, str)
+    jobQueued = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, config=None):
         super(OCR_qt, self).__init__(parent)
+        config = config or {}
+        pool_config = config.get("engine_pool") or {}
         self.img_path = ""
+        self.image = None
         self.use_angle = True
         self.cls = True
         self.default_lan = "ch"
         self.result = []
         self.ocrinfer = None
+        self.pool = EnginePool(
+            max_engines=pool_config.get("max_engines", 3),
+            memory_budget_mb=pool_config.get("memory_budget_mb"),
+        )
+        # "thread": 在工作线程中推理; "process": 交给多进程 OCRProcessFarm
+        self.backend = config.get("backend", "thread")
+        self.workers = config.get("workers", 2)
+        self._farm = None
+        self.tiling = config.get("tiling") or {}
+        self.streaming = config.get("streaming") or {}
+        cache_config = config.get("cache") or {}
+        self.cache = None
+        if cache_config.get("enabled"):
+            self.cache = OCRResultCache(cache_config.get("dir"), cache_config.get("max_mb"))
+
+        # 任务队列：界面线程 submit/cancel，工作线程逐个取出执行
+        self._jobs = []  # heap of (priority, job_id, job)
+        self._activeJob = None
+        self._jobLock = threading.Lock()
+        self.jobQueued.connect(self._processNext)
+
+    def hasEngine(self, lan="ch", use_angle=True):
+        if self.backend == "process":
+            return self._farm is not None and (self._farm.lang, self._farm.use_angle) == (lan, use_angle)
+        return self.pool.has(lan, use_angle)
+
+    def farm(self, lan="ch", use_angle=True):
+        """进程池后端；语言或方向分类器变化时重建"""
+        if self._farm is not None and (self._farm.lang, self._farm.use_angle) != (lan, use_angle):
+            self._farm.shutdown(wait=False)
+            self._farm = None
+        if self._farm is None:
+            from .ocr_farm import OCRProcessFarm
+            self._farm = OCRProcessFarm(self.workers, lan, use_angle)
+        return self._farm
+
+    def shutdown(self):
+        self.cancelJobs()
+        if self._farm is not None:
+            self._farm.shutdown()
+            self._farm = None
+
+    def submit(self, img_path, image=None, lan="ch", use_angle=True, priority=0, stream=True):
+        """加入识别任务（可在任意线程调用），返回任务号
+
+        同一图像、同样参数的任务已在排队或执行时不重复加入；
+        没有图像时不加入，返回 None。
+        """
+        if not img_path and image is None:
+            return None
+        with self._jobLock:
+            for job in [self._activeJob] + [entry[2] for entry in self._jobs]:
+                if job is not None and not job.cancelled() and job.sameTask(img_path, lan, use_angle):
+                    if priority < job.priority and job is not self._activeJob:
+                        # 后台任务变为前台任务：提升优先级
+                        job.priority = priority
+                        job.stream = stream
+                        self._jobs = [(j.priority, j.job_id, j) for _, _, j in self._jobs]
+                        heapq.heapify(self._jobs)
+                    return job.job_id
+            job = OCRJob(img_path, image, lan, use_angle, priority, stream)
+            heapq.heappush(self._jobs, (job.priority, job.job_id, job))
+        self.jobQueued.emit()
+        return job.job_id
 
+    def cancel(self, job_id):
+        with self._jobLock:
+            for job in [self._activeJob] + [entry[2] for entry in self._jobs]:
+                if job is not None and job.job_id == job_id:
+                    job.cancel()
 
+    def cancelJobs(self, keep_paths=()):
+        """取消图像不在 keep_paths 中的全部任务（包括正在执行的）"""
+        keep_paths = set(keep_paths)
+        with self._jobLock:
+            for job in [self._activeJob] + [entry[2] for entry in self._jobs]:
+                if job is not None and job.img_path not in keep_paths:
+                    job.cancel()
 
-    def set_task(self, img_path='./imgs/11.jpg', use_angle=True, cls=True, lan="ch", load=True):
+    def pendingJobs(self):
+        with self._jobLock:
+            return [entry[2] for entry in sorted(self._jobs) if not entry[2].cancelled()]
+
+    @pyqtSlot()
+    def _processNext(self):
+        with self._jobLock:
+            job = None
+            while self._jobs:
+                job = heapq.heappop(self._jobs)[2]
+                if not job.cancelled():
+                    break
+                job = None
+            self._activeJob = job
+        if job is None:
+            return
+        try:
+            self.runJob(job)
+        finally:
+            with self._jobLock:
+                self._activeJob = None
+
+    def runJob(self, job):
+        try:
+            self._checkCancelled(job)
+            image = job.image
+            if image is None:
+                image = img_file_to_arr(job.img_path)
+            result = self.recognize(image, job)
+        except JobCancelled:
+            logger.info("OCR job cancelled: {}".format(job))
+            self.jobCancelled.emit(job.job_id, job.img_path)
+            return None
+        except Exception as e:
+            # 异常不能逃出工作线程的槽函数，否则 PyQt 会中止整个进程
+            logger.error("OCR job failed: {}: {}".format(job, e))
+            self.jobFailed.emit(job.job_id, job.img_path, str(e))
+            return None
+
+        self.result = result
+        # 在工作线程中整理成 OCRResultStore，界面线程只负责插入
+        from .result_store import OCRResultStore
+        store = OCRResultStore.fromResult(result)
+        self.sendResult.emit(job.job_id, job.img_path, result, store)
+        return result
+
+    def _checkCancelled(self, job):
+        if job is not None and job.cancelled():
+            raise JobCancelled()
+
+    def _wait(self, future, job):
+        """等待进程池结果，期间响应取消"""
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                if job is not None and job.cancelled():
+                    future.cancel()
+                    raise JobCancelled()
+
+    def set_task(self, img_path='./imgs/11.jpg', use_angle=True, cls=True, lan="ch", load=True, image=None):
+        """记录任务参数，由 start() 提交为任务
+
+        image 为界面已解码（并按 EXIF 旋转）的 RGB ndarray，提供时不再重复读取文件
+        """
         self.img_path = img_path
+        self.image = image
         self.use_angle = use_angle
         self.cls = cls
         self.default_lan = lan
-
         if load:
-            print("加载模型......")
-            # Only pass explicit model dirs if they exist and look complete;
-            # otherwise let PaddleOCR handle downloading / locating models itself.
-            det_dir = f"models/det/{lan}"
-            rec_dir = f"models/cls/{lan}"
-
-            if not (os.path.isdir(det_dir) and os.path.exists(os.path.join(det_dir, "inference.yml"))):
-                print(f"PaddleOCR: model directory '{det_dir}' missing or incomplete; will not pass det_model_dir (PaddleOCR may download models).")
-                det_dir = None
-            if not (os.path.isdir(rec_dir) and os.path.exists(os.path.join(rec_dir, "inference.yml"))):
-                print(f"PaddleOCR: model directory '{rec_dir}' missing or incomplete; will not pass rec_model_dir (PaddleOCR may download models).")
-                rec_dir = None
-
-            # 只传递 PaddleOCR 3.x 推荐参数，自动下载模型
-            # 禁用文档预处理功能，避免加载 PP-LCNet_x1_0_doc_ori 模型
-            params = dict(
-                use_angle_cls=use_angle,
-                lang=lan,
-                use_doc_orientation_classify=False,
-                use_doc_unwarping=False,
-            )
-            # 不再传递 det_model_dir、rec_model_dir，完全自动下载
+            self.ocrinfer = None
 
-            # Try to initialize PaddleOCR; if it complains about unknown args, remove them and retry
-            while True:
-                try:
-                    self.ocrinfer = PaddleOCR(**params)
-                    break
-                except ValueError as e:
-                    msg = str(e)
-                    if "Unknown argument:" in msg:
-                        name = msg.split("Unknown argument:")[-1].strip()
-                        if name in params:
-                            print(f"PaddleOCR: removing unsupported argument '{name}' and retrying...")
-                            params.pop(name, None)
-                            continue
-                    # re-raise if it's not an unknown-argument error we can handle
-                    raise
-
-            print("模型加载完成......")
+    @pyqtSlot(str, bool)
+    def warmup(self, lan="ch", use_angle=True):
+        """在工作线程中预加载模型，并做一次推理以完成内存分配"""
+        self.sendStatus.emit(f"模型预热中({lan})...")
+        t0 = time.perf_counter()
+        try:
+            if self.backend == "process":
+                self.farm(lan, use_angle).warmup()
+            else:
+                engine = self.pool.get(lan, use_angle)
+                run_ocr(engine, to_engine_image(warmup_image()))
+        except Exception as e:
+            logger.warning("Engine warm-up failed: {}".format(e))
+            self.sendStatus.emit(f"模型预热失败({lan})")
+            return
+        elapsed = time.perf_counter() - t0
+        logger.info("Engine warm-up finished: {} in {:.2f}s".format(lan, elapsed))
+        self.warmupFinished.emit(lan, elapsed)
 
+    @pyqtSlot()
     def start(self):
         if not self.img_path:
             print("No img_path input.")
             return
 
         # 用于线程启动
-        # call ocr without passing deprecated/unsupported kwargs like 'cls'
-        self.ocr(self.img_path)
+        self.submit(self.img_path, self.image, self.default_lan, self.use_angle)
 
-    def ocr(self, img_path='./imgs/11.jpg', use_angle=True, cls=True, lan="ch", use_gpu=1):
-        self.img_path = img_path
-        self.default_lan = lan
+    def setLanguage(self, lan, use_angle=True):
+        if (lan, use_angle) != (self.default_lan, self.use_angle):
+            self.default_lan = lan
+            self.use_angle = use_angle
+            self.ocrinfer = None
+
+    def engine(self):
+        if self.ocrinfer is None:
+            self.sendStatus.emit(f"加载模型({self.default_lan})...")
+            self.ocrinfer = self.pool.get(self.default_lan, self.use_angle)
+        return self.ocrinfer
+
+    @pyqtSlot(str, object, object, str)
+    def recognizeRegions(self, img_path, rows, crops, lan):
+        """只识别给定的区域（跳过检测），rows 原样随结果返回
 
-        # PaddleOCR.predict no longer accepts 'cls' keyword in newer versions;
-        # call without it to avoid TypeError
+        区域识别总在本线程的引擎上执行，process 后端的子进程只负责整页识别。
+        """
+        self.setLanguage(lan, self.use_angle)
+        t0 = time.perf_counter()
         try:
-            result = self.ocrinfer.ocr(img_path)
-        except TypeError:
-            # fallback: try with explicit safe kwargs if needed in older versions
-            result = self.ocrinfer.ocr(img_path)
+            results = run_recognition(self.engine(), [to_engine_image(crop) for crop in crops])
+        except Exception as e:
+            logger.error("Region recognition failed for {}: {}".format(img_path, e))
+            self.regionsFailed.emit(img_path, str(e))
+            return
+        elapsed = (time.perf_counter() - t0) * 1000
+        self.sendStatus.emit(f"区域识别完成({len(rows)} 个, {elapsed:.0f} ms)")
+        self.sendRegionResults.emit(img_path, rows, results)
 
-        self.result = result
-        for line in result:
-            print(line)
-        self.sendResult.emit(result)
+    def useTiling(self, image):
+        return bool(self.tiling.get("enabled")) and max(image.shape[:2]) > self.tiling.get("min_size", 4000)
+
+    def recognizeTiled(self, image, job=None):
+        """超大图分块识别，process 后端时分块并行"""
+        tile_size = self.tiling.get("tile_size", 1280)
+        overlap = self.tiling.get("overlap", 200)
+        # 按内存上限限制同时处理的分块数（每块 BGR 副本约 tile_size^2*3 字节）
+        tile_mb = tile_size * tile_size * 3 / (1024.0 * 1024.0)
+        max_in_flight = max(1, int(self.tiling.get("max_memory_mb", 512) / tile_mb))
+        if self.backend == "process":
+            farm = self.farm(self.default_lan, self.use_angle)
+            submit = farm.submit
+            max_in_flight = min(max_in_flight, farm.workers * 2)
+        else:
+            engine = self.engine()
+
+            def submit(tile):
+                return ocr_result_to_dict(run_ocr(engine, to_engine_image(tile)))
+
+            max_in_flight = 1
+        n_tiles = len(tile_grid(image.shape[0], image.shape[1], tile_size, overlap))
+        self.sendStatus.emit(f"分块识别中({n_tiles} 块)...")
+        return run_tiled(
+            image, submit, tile_size, overlap, max_in_flight,
+            check=lambda: self._checkCancelled(job),
+        )
+
+    def recognizeStreaming(self, image, job):
+        """检测完成后立即发出文本框，识别结果分批发出；不支持分步调用时返回 None"""
+        engine = self.engine()
+        bgr = to_engine_image(image)
+        boxes = run_detection(engine, bgr)
+        if boxes is None:
+            return None
+        self._checkCancelled(job)
+        self.sendBoxes.emit(job.job_id, job.img_path, boxes)
+
+        chunk_size = max(1, self.streaming.get("chunk_size", 16))
+        texts = []
+        for start in range(0, len(boxes), chunk_size):
+            self._checkCancelled(job)
+            crops = [crop_box(bgr, box) for box in boxes[start:start + chunk_size]]
+            part = run_recognition(engine, crops)
+            texts.extend(part)
+            self.sendTexts.emit(job.job_id, job.img_path, start, part)
+        return [{
+            "rec_polys": boxes,
+            "rec_texts": [txt for txt, _ in texts],
+            "rec_scores": [score for _, score in texts],
+        }]
+
+    def recognize(self, image, job=None):
+        """对 RGB ndarray 执行检测+识别，优先使用结果缓存
+
+        job 不为空时使用任务的语言设置，并在各阶段之间检查是否已取消。
+        """
+        if job is not None:
+            self.setLanguage(job.lan, job.use_angle)
+        tiled = self.useTiling(image)
+        key = None
+        if self.cache is not None:
+            extra = None
+            if tiled:
+                extra = {"tiling": [self.tiling.get("tile_size"), self.tiling.get("overlap")]}
+            key = self.cache.makeKey(image, self.default_lan, self.use_angle, DEFAULT_PIPELINE, extra)
+            record = self.cache.get(key)
+            if record is not None:
+                return [record]
+
+        streaming = (
+            job is not None
+            and job.stream
+            and not tiled
+            and self.backend != "process"
+            and self.streaming.get("enabled")
+        )
+        result = self.recognizeStreaming(image, job) if streaming else None
+        if result is None:
+            if tiled:
+                result = [self.recognizeTiled(image, job)]
+            elif self.backend == "process":
+                farm = self.farm(self.default_lan, self.use_angle)
+                result = [self._wait(farm.submit(image), job)]
+            else:
+                result = run_ocr(self.engine(), to_engine_image(image))
+            self._checkCancelled(job)
+
+        if key is not None:
+            self.cache.put(key, ocr_result_to_dict(result))
+        return result
+
+    def ocr(self, img_path='./imgs/11.jpg', use_angle=True, cls=True, lan=None, use_gpu=1, image=None):
+        """同步识别一张图像（在调用线程中执行，不经过任务队列）"""
+        job = OCRJob(img_path, image, lan or self.default_lan, self.use_angle, stream=False)
+        return self.runJob(job)
 
     def vis_ocr_result(self, save_folder='./output/'):
         image = Image.open(self.img_path).convert('RGB')
@@ -125,6 +778,7 @@ class OCR_qt(QObject):
         txts = [line[1][0] for line in self.result]
         scores = [line[1][1] for line in self.result]
         # 优先使用 paddleocr 提供的 draw_ocr（新老版本兼容），否则使用 PIL 回退实现
+        draw_ocr = _draw_ocr()
         if draw_ocr is not None:
             im_show = draw_ocr(image, boxes, txts, scores, font_path='./fonts/simfang.ttf')
             im_show = Image.fromarray(im_show)
@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+"""
+目录浏览时在后台预先解码后续图像
+"""
+import collections
+import concurrent.futures
+import threading
+
+from ..logger import logger
+
+
+class ImagePrefetcher(object):
+    """用后台线程执行 loader(path)，结果按路径保存，take() 取出
+
+    只保留最近一次 prefetch() 给出的路径，其余的取消或丢弃；
+    on_loaded(path, value) 在后台线程中调用。
+    """
+
+    def __init__(self, loader, workers=1, on_loaded=None):
+        self.loader = loader
+        self.on_loaded = on_loaded
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max(1, int(workers)), thread_name_prefix="prefetch"
+        )
+        self._futures = collections.OrderedDict()  # path -> Future
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        value = self.loader(path)
+        if self.on_loaded is not None and value is not None:
+            self.on_loaded(path, value)
+        return value
+
+    def prefetch(self, paths):
+        """预取 paths（按顺序提交），不在其中的旧任务被取消"""
+        paths = list(paths)
+        with self._lock:
+            for path in list(self._futures):
+                if path not in paths:
+                    self._futures.pop(path).cancel()
+            for path in paths:
+                if path not in self._futures:
+                    self._futures[path] = self._executor.submit(self._load, path)
+
+    def take(self, path):
+        """取出 path 的预取结果；尚未开始的任务被取消并返回 None，进行中的等待其完成"""
+        with self._lock:
+            future = self._futures.pop(path, None)
+        if future is None or future.cancel():
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("Prefetch failed for {}: {}".format(path, e))
+            return None
+
+    def clear(self):
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+
+    def shutdown(self):
+        self.clear()
+        self._executor.shutdown(wait=False)
@@ -16,6 +16,20 @@ def newIcon(icon):
     return QtGui.QIcon(osp.join(":/", icons_dir, "%s.png" % icon))
 
 
+def img_arr_to_qimage(img_arr):
+    """用 RGB ndarray 的内存构造 QImage（不复制像素）
+
+    QImage 不持有这块内存，返回的对象上保留对数组的引用。
+    """
+    img_arr = np.ascontiguousarray(img_arr)
+    height, width = img_arr.shape[:2]
+    qimage = QtGui.QImage(
+        img_arr.data, width, height, img_arr.strides[0], QtGui.QImage.Format_RGB888
+    )
+    qimage.ndarray = img_arr
+    return qimage
+
+
 def newButton(text, icon=None, slot=None):
     b = QtWidgets.QPushButton(text)
     if icon is not None:
@@ -68,6 +82,33 @@ def addActions(widget, actions):
             widget.addAction(action)
 
 
+def rowsToSelection(model, rows):
+    """QItemSelection of the given rows, consecutive rows merged into one range."""
+    selection = QtCore.QItemSelection()
+    start = prev = None
+    for row in sorted(set(rows)):
+        if prev is not None and row == prev + 1:
+            prev = row
+            continue
+        if start is not None:
+            selection.select(model.index(start, 0), model.index(prev, 0))
+        start = prev = row
+    if start is not None:
+        selection.select(model.index(start, 0), model.index(prev, 0))
+    return selection
+
+
+def selectRows(view, rows, scroll=True):
+    """Replace the selection of view with rows in one call, scrolling once."""
+    rows = list(rows)
+    view.selectionModel().select(
+        rowsToSelection(view.model(), rows),
+        QtCore.QItemSelectionModel.ClearAndSelect,
+    )
+    if scroll and rows:
+        view.scrollTo(view.model().index(min(rows), 0))
+
+
 def labelValidator():
     return QtGui.QRegExpValidator(QtCore.QRegExp(r"^[^ \t].+"), None)
 
@@ -0,0 +1,144 @@
+# -*- coding:utf-8 -*-
+"""
+OCR结果的紧凑存储
+
+文本框坐标、置信度保存在 numpy 数组中，文本拼接为一个字符串并记录偏移；
+画布和列表直接读取这些数组，只有被交互（悬停、选中、编辑）的文本框才
+生成可编辑的 Shape 对象。
+"""
+import numpy as np
+
+from .ocr_utils import normalize_ocr_result
+
+
+def _box_to_rect(box):
+    """四点框 -> (x1, y1, x2, y2)，取第 0、2 个点；格式异常时取外接矩形"""
+    try:
+        p0 = box[0]
+        p2 = box[2]
+        return int(p0[0]), int(p0[1]), int(p2[0]), int(p2[1])
+    except Exception:
+        pts = [(int(p[0]), int(p[1])) for p in box]
+        xs = [pt[0] for pt in pts]
+        ys = [pt[1] for pt in pts]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+class OCRResultStore(object):
+    """一页OCR结果：第 i 行对应 boxes[i]、scores[i] 和 text(i)
+
+    shape(i) 按需生成 Shape 并缓存，生成时依次调用 decorate(shape) 和
+    on_materialize(row, shape)；visible/deleted 为逐行标记，order 为绘制顺序。
+    """
+
+    def __init__(self, boxes, texts, scores=None, decorate=None):
+        n = len(boxes)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(n, 4)
+        # 保证 x1 <= x2, y1 <= y2
+        self.boxes = np.concatenate(
+            [np.minimum(boxes[:, :2], boxes[:, 2:]), np.maximum(boxes[:, :2], boxes[:, 2:])],
+            axis=1,
+        )
+        if scores is None or len(scores) != n:
+            scores = np.zeros(n)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        texts = [str(t) for t in texts]
+        self._text = "".join(texts)
+        self._offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in texts], out=self._offsets[1:])
+        self._edited = {}  # row -> text
+        self.colors = np.zeros((n, 3), dtype=np.uint8)
+        self.visible = np.ones(n, dtype=bool)
+        self.deleted = np.zeros(n, dtype=bool)
+        self.materializedMask = np.zeros(n, dtype=bool)
+        self.order = np.arange(n)
+        self._shapes = {}  # row -> Shape
+        self._rows = {}  # id(Shape) -> row
+        self.decorate = decorate
+        self.on_materialize = None
+
+    @classmethod
+    def fromResult(cls, result, decorate=None):
+        """由 PaddleOCR 结果（新旧格式均可）构造，无法解析的文本框被跳过"""
+        boxes, txts, scores = normalize_ocr_result(result)
+        rects, texts, confs = [], [], []
+        for i, box in enumerate(boxes):
+            try:
+                rects.append(_box_to_rect(box))
+            except Exception:
+                continue
+            texts.append(txts[i] if i < len(txts) else "")
+            confs.append(scores[i] if i < len(scores) and scores[i] is not None else 0.0)
+        return cls(rects, texts, confs, decorate=decorate)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def text(self, row):
+        if row in self._edited:
+            return self._edited[row]
+        return self._text[self._offsets[row]:self._offsets[row + 1]]
+
+    def setText(self, row, text):
+        self._edited[row] = text
+
+    def texts(self):
+        return [self.text(row) for row in range(len(self))]
+
+    def rect(self, row):
+        return tuple(int(v) for v in self.boxes[row])
+
+    def label(self, row):
+        x1, y1, x2, y2 = self.rect(row)
+        return f"({x1},{y1}),({x2},{y2})"
+
+    def materialized(self, row):
+        return self._shapes.get(row)
+
+    def rowOf(self, shape):
+        return self._rows.get(id(shape))
+
+    def shape(self, row):
+        """返回第 row 行的 Shape，首次访问时生成"""
+        shape = self._shapes.get(row)
+        if shape is not None:
+            return shape
+        from ..shape import Shape
+        from PyQt5 import QtCore
+
+        x1, y1, x2, y2 = self.rect(row)
+        shape = Shape(label=self.label(row), shape_type="rectangle", group_id=row)
+        shape.addPoint(QtCore.QPointF(x1, y1))
+        shape.addPoint(QtCore.QPointF(x2, y2))
+        self._shapes[row] = shape
+        self._rows[id(shape)] = row
+        self.materializedMask[row] = True
+        if self.decorate is not None:
+            self.decorate(shape)
+        if self.on_materialize is not None:
+            self.on_materialize(row, shape)
+        return shape
+
+    def delete(self, row):
+        self.deleted[row] = True
+
+    def setOrder(self, rows):
+        """按 rows 的顺序绘制（后绘制的在上层），未列出的行保持原顺序排在最前"""
+        rows = np.asarray(rows, dtype=np.int64)
+        listed = np.zeros(len(self), dtype=bool)
+        listed[rows] = True
+        self.order = np.concatenate([self.order[~listed[self.order]], rows])
+
+    def drawableRows(self, rect=None):
+        """尚未生成 Shape、可见且未删除的行（按绘制顺序），rect=(x1, y1, x2, y2) 时只取与之相交的"""
+        mask = self.visible & ~self.deleted & ~self.materializedMask
+        if rect is not None:
+            x1, y1, x2, y2 = rect
+            b = self.boxes
+            mask &= (b[:, 2] >= x1) & (b[:, 0] <= x2) & (b[:, 3] >= y1) & (b[:, 1] <= y2)
+        return self.order[mask[self.order]]
+
+    def hitTest(self, x, y, radius=0.0):
+        """包含点 (x, y)（外扩 radius）的可绘制行，后加入的在前"""
+        rows = self.drawableRows((x - radius, y - radius, x + radius, y + radius))
+        return rows[::-1].tolist()
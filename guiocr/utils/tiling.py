@@ -0,0 +1,210 @@
+# -*- coding:utf-8 -*-
+"""
+超大图像分块OCR
+
+把图像切成有重叠的分块分别识别，再把各分块的文本框平移回原图坐标，
+连接跨接缝被切开的文本行，去掉接缝处重复或被截断的文本框。
+"""
+import concurrent.futures
+
+import numpy as np
+
+
+# 文本框距分块内部边缘小于该像素数时视为被接缝截断
+EDGE_MARGIN = 2
+
+
+def _starts(length, tile_size, step):
+    if length <= tile_size:
+        return [0]
+    return list(range(0, length - tile_size, step)) + [length - tile_size]
+
+
+def tile_grid(height, width, tile_size=1280, overlap=200):
+    """返回覆盖整幅图像的分块 [(x0, y0, x1, y1), ...]，相邻分块重叠 overlap 像素"""
+    step = max(1, tile_size - overlap)
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in _starts(height, tile_size, step)
+        for x in _starts(width, tile_size, step)
+    ]
+
+
+def _completed(value):
+    future = concurrent.futures.Future()
+    future.set_result(value)
+    return future
+
+
+def run_tiled(image, submit, tile_size=1280, overlap=200, max_in_flight=1, check=None):
+    """分块识别 image
+
+    submit(tile) 接收分块 ndarray（原图的视图），返回 ocr_result_to_dict
+    格式的字典或对应的 Future；同时处理中的分块数不超过 max_in_flight。
+    check() 在每个分块提交前调用，抛出异常即中止并取消未完成的分块。
+    """
+    height, width = image.shape[:2]
+    tiles = tile_grid(height, width, tile_size, overlap)
+    max_in_flight = max(1, int(max_in_flight))
+
+    results = []
+    pending = []
+    try:
+        for rect in tiles:
+            if check is not None:
+                check()
+            x0, y0, x1, y1 = rect
+            future = submit(image[y0:y1, x0:x1])
+            if not isinstance(future, concurrent.futures.Future):
+                future = _completed(future)
+            pending.append((rect, future))
+            while len(pending) >= max_in_flight:
+                done_rect, done_future = pending.pop(0)
+                results.append((done_rect, done_future.result()))
+        for rect, future in pending:
+            results.append((rect, future.result()))
+    except BaseException:
+        for _, future in pending:
+            future.cancel()
+        raise
+    return merge_tile_results(results, width, height)
+
+
+def _same_line(a, b, min_overlap=0.5):
+    """两个文本框的纵向范围重叠超过较矮者的 min_overlap，视为同一行"""
+    overlap = min(a[3], b[3]) - max(a[1], b[1])
+    return overlap > min_overlap * max(min(a[3] - a[1], b[3] - b[1]), 1e-6)
+
+
+def _join_text(left, right, ratio):
+    """拼接同一行被接缝切开的两段文本，去掉重叠区内重复识别的字符
+
+    ratio 为重叠宽度占右段宽度的比例，用来估计重复的字符数；优先使用
+    与估计值相近的左段后缀/右段前缀精确匹配。
+    """
+    expected = int(round(len(right) * ratio))
+    for k in range(min(len(left), len(right), 2 * expected + 1), 0, -1):
+        if 2 * k >= expected and left.endswith(right[:k]):
+            return left + right[k:]
+    return left + right[min(expected, len(right)):]
+
+
+def _join_pieces(a, b):
+    ax1, ay1, ax2, ay2 = a["bounds"]
+    bx1, by1, bx2, by2 = b["bounds"]
+    ratio = max(0.0, ax2 - bx1) / max(bx2 - bx1, 1e-6)
+    if len(a["pts"]) == 4 and len(b["pts"]) == 4:
+        # 四边形按 左上、右上、右下、左下 排列
+        pts = np.array([a["pts"][0], b["pts"][1], b["pts"][2], a["pts"][3]])
+    else:
+        x1, y1, x2, y2 = min(ax1, bx1), min(ay1, by1), max(ax2, bx2), max(ay2, by2)
+        pts = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float64)
+    wa, wb = ax2 - ax1, bx2 - bx1
+    return dict(
+        pts=pts,
+        txt=_join_text(a["txt"], b["txt"], ratio),
+        score=(a["score"] * wa + b["score"] * wb) / max(wa + wb, 1e-6),
+        bounds=(min(ax1, bx1), min(ay1, by1), max(ax2, bx2), max(ay2, by2)),
+        tile=b["tile"],
+        cut_left=a["cut_left"],
+        cut_right=b["cut_right"],
+        cut_other=a["cut_other"] or b["cut_other"],
+    )
+
+
+def _join_seams(pieces):
+    """把横跨纵向接缝、被切成几段的同一行文本连成一个文本框
+
+    左段在分块右边缘被截断、右段在相邻分块左边缘被截断，两段在重叠带内
+    横向相交且位于同一行时合并；只在同一行分块之间连接，上下两行分块
+    各自连出的重复结果留给后面的去重处理。
+    """
+    pieces = sorted(pieces, key=lambda p: (p["tile"][1], p["bounds"][0]))
+    joined = []
+    for piece in pieces:
+        if piece["cut_left"]:
+            for i, prev in enumerate(joined):
+                if (
+                    prev["cut_right"]
+                    and prev["tile"][1] == piece["tile"][1]
+                    and prev["tile"][0] < piece["tile"][0]
+                    and prev["bounds"][0] < piece["bounds"][0] <= prev["bounds"][2]
+                    and piece["bounds"][2] > prev["bounds"][2]
+                    and _same_line(prev["bounds"], piece["bounds"])
+                ):
+                    joined[i] = _join_pieces(prev, piece)
+                    break
+            else:
+                joined.append(piece)
+        else:
+            joined.append(piece)
+    return joined
+
+
+def merge_tile_results(tile_results, width, height, overlap_threshold=0.5):
+    """合并 [((x0, y0, x1, y1), record), ...] 为整图结果并去重
+
+    先把跨接缝被切开的同一行文本连起来；之后完整的文本框优先于被接缝
+    截断的，大框优先于小框；与已保留文本框的重叠面积超过较小者
+    overlap_threshold 的视为重复。
+    """
+    pieces = []
+    for (x0, y0, x1, y1), record in tile_results:
+        for poly, txt, score in zip(
+                record.get("rec_polys", []),
+                record.get("rec_texts", []),
+                record.get("rec_scores", []),
+        ):
+            if len(poly) == 0:
+                continue
+            pts = np.asarray(poly, dtype=np.float64)[:, :2] + (x0, y0)
+            bx1, by1 = pts.min(axis=0)
+            bx2, by2 = pts.max(axis=0)
+            pieces.append(dict(
+                pts=pts,
+                txt=txt,
+                score=score,
+                bounds=(bx1, by1, bx2, by2),
+                tile=(x0, y0),
+                cut_left=x0 > 0 and bx1 <= x0 + EDGE_MARGIN,
+                cut_right=x1 < width and bx2 >= x1 - EDGE_MARGIN,
+                cut_other=(
+                    (y0 > 0 and by1 <= y0 + EDGE_MARGIN)
+                    or (y1 < height and by2 >= y1 - EDGE_MARGIN)
+                ),
+            ))
+
+    candidates = []
+    for piece in _join_seams(pieces):
+        bx1, by1, bx2, by2 = bounds = piece["bounds"]
+        cut = piece["cut_left"] or piece["cut_right"] or piece["cut_other"]
+        area = (bx2 - bx1) * (by2 - by1)
+        candidates.append((cut, -area, -piece["score"], piece["pts"], piece["txt"], piece["score"], bounds))
+
+    candidates.sort(key=lambda c: c[:3])
+    kept = []
+    kept_bounds = np.zeros((len(candidates), 4))
+    for cut, _, _, pts, txt, score, bounds in candidates:
+        n = len(kept)
+        if n:
+            kb = kept_bounds[:n]
+            ix1 = np.maximum(kb[:, 0], bounds[0])
+            iy1 = np.maximum(kb[:, 1], bounds[1])
+            ix2 = np.minimum(kb[:, 2], bounds[2])
+            iy2 = np.minimum(kb[:, 3], bounds[3])
+            inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+            areas = (kb[:, 2] - kb[:, 0]) * (kb[:, 3] - kb[:, 1])
+            own = (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+            smaller = np.maximum(np.minimum(areas, own), 1e-6)
+            if np.any(inter / smaller > overlap_threshold):
+                continue
+        kept_bounds[n] = bounds
+        kept.append((pts, txt, score, bounds))
+
+    # 恢复从上到下、从左到右的阅读顺序
+    kept.sort(key=lambda k: (k[3][1], k[3][0]))
+    return {
+        "rec_polys": [pts.tolist() for pts, _, _, _ in kept],
+        "rec_texts": [txt for _, txt, _, _ in kept],
+        "rec_scores": [float(score) for _, _, score, _ in kept],
+    }
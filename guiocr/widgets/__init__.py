@@ -8,12 +8,19 @@ from .color_dialog import ColorDialog
 
 from .file_dialog_preview import FileDialogPreview
 
+from .image_pyramid import ImagePyramid
+
 from .label_dialog import LabelDialog
 from .label_dialog import LabelQLineEdit
 
 from .label_list_widget import LabelListWidget
 from .label_list_widget import LabelListWidgetItem
 
+from .result_list_model import ResultListModel
+from .result_list_model import ResultListView
+
+from .shape_index import ShapeIndex
+
 from .tool_bar import ToolBar
 
 # from .unique_label_qlist_widget import UniqueLabelQListWidget
@@ -1,12 +1,19 @@
-import PIL.Image
-import PIL.ImageEnhance
+import numpy as np
 from PyQt5.QtCore import Qt
-from PyQt5 import QtGui
 from PyQt5 import QtWidgets
 
 from .. import utils
 
 
+def _blend(base, values, factor):
+    # PIL.Image.blend: base + factor * (values - base) in float32,
+    # clipped and truncated to uint8
+    values = np.float32(base) + np.float32(factor) * (
+        np.asarray(values, np.float32) - np.float32(base)
+    )
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+
 class BrightnessContrastDialog(QtWidgets.QDialog):
     def __init__(self, img, callback, parent=None):
         super(BrightnessContrastDialog, self).__init__(parent)
@@ -21,21 +28,46 @@ class BrightnessContrastDialog(QtWidgets.QDialog):
         formLayout.addRow(self.tr("Contrast"), self.slider_contrast)
         self.setLayout(formLayout)
 
-        assert isinstance(img, PIL.Image.Image)
+        assert isinstance(img, np.ndarray) and img.dtype == np.uint8
         self.img = img
         self.callback = callback
+        self._sample = None
+
+    def _luminance_sample(self):
+        # pixels used for the contrast mean, taken once; large images are
+        # subsampled as only the mean is needed
+        if self._sample is None:
+            img = self.img
+            step = max(1, int((img.shape[0] * img.shape[1] / 4e6) ** 0.5))
+            self._sample = img[::step, ::step]
+        return self._sample
+
+    def lut(self, brightness, contrast):
+        """Lookup table reproducing PIL.ImageEnhance Brightness then Contrast.
+
+        Exact for images up to 4 megapixels; larger ones take the contrast
+        mean from a subsample.
+        """
+        values = _blend(0, np.arange(256), brightness)
+        sample = values[self._luminance_sample()]
+        if sample.ndim == 3:
+            # PIL's "L" conversion: ITU-R 601-2 luma in 16-bit fixed point
+            sample = (
+                sample[..., 0].astype(np.uint32) * 19595
+                + sample[..., 1].astype(np.uint32) * 38470
+                + sample[..., 2].astype(np.uint32) * 7471
+                + 0x8000
+            ) >> 16
+        hist = np.bincount(sample.ravel(), minlength=256)
+        mean = int(np.dot(hist, np.arange(256)) / max(hist.sum(), 1) + 0.5)
+        return _blend(mean, values, contrast)
 
     def onNewValue(self, value):
         brightness = self.slider_brightness.value() / 50.0
         contrast = self.slider_contrast.value() / 50.0
 
-        img = self.img
-        img = PIL.ImageEnhance.Brightness(img).enhance(brightness)
-        img = PIL.ImageEnhance.Contrast(img).enhance(contrast)
-
-        img_data = utils.img_pil_to_data(img)
-        qimage = QtGui.QImage.fromData(img_data)
-        self.callback(qimage)
+        img = self.lut(brightness, contrast)[self.img]
+        self.callback(utils.img_arr_to_qimage(img))
 
     def _create_slider(self):
         slider = QtWidgets.QSlider(Qt.Horizontal)
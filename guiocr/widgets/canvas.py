@@ -1,3 +1,7 @@
+import itertools
+
+import numpy as np
+
 from PyQt5 import QtCore
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
@@ -5,6 +9,8 @@ from PyQt5 import QtWidgets
 from .. import QT5
 from ..shape import Shape
 from ..utils import *
+from .image_pyramid import ImagePyramid
+from .shape_index import ShapeIndex
 
 
 # TODO(unknown):
@@ -48,10 +54,22 @@ class Canvas(QtWidgets.QWidget):
                 )
             )
         self.num_backups = kwargs.pop("num_backups", 10)
+        # shapes smaller than this on screen (pixels) are drawn as plain
+        # rectangles; 0 disables level-of-detail rendering
+        self.lod_size = kwargs.pop("lod_size", 12)
         super(Canvas, self).__init__(*args, **kwargs)
         # Initialise local state.
         self.mode = self.EDIT
         self.shapes = []
+        # spatial index over self.shapes for hover and click hit-testing
+        self.shapeIndex = ShapeIndex(pad=self.epsilon)
+        # OCR results drawn straight from arrays until a box is interacted
+        # with (see loadStore)
+        self.store = None
+        # store row (and its corner) under the cursor; drawn from the arrays,
+        # only turned into a Shape when clicked
+        self.hRow = None
+        self.hRowVertex = None
         self.shapesBackups = []
         self.current = None
         self.selectedShapes = []  # save the selected shapes here
@@ -67,6 +85,7 @@ class Canvas(QtWidgets.QWidget):
         self.offsets = QtCore.QPoint(), QtCore.QPoint()
         self.scale = 1.0
         self.pixmap = QtGui.QPixmap()
+        self.pyramid = None
         self.visible = {}
         self._hideBackround = False
         self.hideBackround = False
@@ -141,6 +160,7 @@ class Canvas(QtWidgets.QWidget):
         # push this right back onto the stack.
         shapesBackup = self.shapesBackups.pop()
         self.shapes = shapesBackup
+        self.shapeIndex.rebuild(self.shapes)
         self.selectedShapes = []
         for shape in self.shapes:
             shape.selected = False
@@ -174,7 +194,8 @@ class Canvas(QtWidgets.QWidget):
     def unHighlight(self):
         if self.hShape:
             self.hShape.highlightClear()
-            self.update()
+            self.updateShapes([self.hShape])
+        self.unHighlightRow()
         self.prevhShape = self.hShape
         self.prevhVertex = self.hVertex
         self.prevhEdge = self.hEdge
@@ -201,6 +222,7 @@ class Canvas(QtWidgets.QWidget):
 
         # Polygon drawing.
         if self.drawing():
+            dirty = self.shapesRect([self.current, self.line])
             self.line.shape_type = self.createMode
 
             self.overrideCursor(CURSOR_DRAW)
@@ -237,7 +259,7 @@ class Canvas(QtWidgets.QWidget):
             elif self.createMode == "point":
                 self.line.points = [self.current[0]]
                 self.line.close()
-            self.repaint()
+            self.updateShapes([self.current, self.line], dirty)
             self.current.highlightClear()
             return
 
@@ -245,25 +267,28 @@ class Canvas(QtWidgets.QWidget):
         if QtCore.Qt.RightButton & ev.buttons():
             if self.selectedShapesCopy and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
+                dirty = self.shapesRect(self.selectedShapesCopy)
                 self.boundedMoveShapes(self.selectedShapesCopy, pos)
-                self.repaint()
+                self.updateShapes(self.selectedShapesCopy, dirty)
             elif self.selectedShapes:
                 self.selectedShapesCopy = [
                     s.copy() for s in self.selectedShapes
                 ]
-                self.repaint()
+                self.updateShapes(self.selectedShapesCopy)
             return
 
         # Polygon/Vertex moving.
         if QtCore.Qt.LeftButton & ev.buttons():
             if self.selectedVertex():
+                dirty = self.shapesRect([self.hShape])
                 self.boundedMoveVertex(pos)
-                self.repaint()
+                self.updateShapes([self.hShape], dirty)
                 self.movingShape = True
             elif self.selectedShapes and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
+                dirty = self.shapesRect(self.selectedShapes)
                 self.boundedMoveShapes(self.selectedShapes, pos)
-                self.repaint()
+                self.updateShapes(self.selectedShapes, dirty)
                 self.movingShape = True
             return
 
@@ -272,7 +297,11 @@ class Canvas(QtWidgets.QWidget):
         # - Highlight vertex
         # Update shape/vertex fill and tooltip value accordingly.
         self.setToolTip(self.tr("Image"))
-        for shape in reversed([s for s in self.shapes if self.isVisible(s)]):
+        # only the previously and newly highlighted shapes need repainting
+        lastHighlighted = self.hShape
+        self.unHighlightRow()
+        nearby = self.shapeIndex.query(pos, self.epsilon / self.scale)
+        for shape in [s for s in nearby if self.isVisible(s)]:
             # Look for a nearby vertex to highlight. If that fails,
             # check if we happen to be inside a shape.
             index = shape.nearestVertex(pos, self.epsilon / self.scale)
@@ -288,7 +317,7 @@ class Canvas(QtWidgets.QWidget):
                 self.overrideCursor(CURSOR_POINT)
                 self.setToolTip(self.tr("Click & drag to move point"))
                 self.setStatusTip(self.toolTip())
-                self.update()
+                self.updateShapes([lastHighlighted, shape])
                 break
             elif index_edge is not None and shape.canAddPoint():
                 if self.selectedVertex():
@@ -300,7 +329,7 @@ class Canvas(QtWidgets.QWidget):
                 self.overrideCursor(CURSOR_POINT)
                 self.setToolTip(self.tr("Click to create point"))
                 self.setStatusTip(self.toolTip())
-                self.update()
+                self.updateShapes([lastHighlighted, shape])
                 break
             elif shape.containsPoint(pos):
                 if self.selectedVertex():
@@ -315,11 +344,16 @@ class Canvas(QtWidgets.QWidget):
                 )
                 self.setStatusTip(self.toolTip())
                 self.overrideCursor(CURSOR_GRAB)
-                self.update()
+                self.updateShapes([lastHighlighted, shape])
                 break
-        else:  # Nothing found, clear highlights, reset state.
-            self.unHighlight()
-        self.vertexSelected.emit(self.hVertex is not None)
+        else:
+            # Then the result-store boxes, which have no Shape yet.
+            if not self.highlightStoreRow(pos):
+                # Nothing found, clear highlights, reset state.
+                self.unHighlight()
+        self.vertexSelected.emit(
+            self.hVertex is not None or self.hRowVertex is not None
+        )
 
     def addPointToEdge(self):
         shape = self.prevhShape
@@ -328,6 +362,7 @@ class Canvas(QtWidgets.QWidget):
         if shape is None or index is None or point is None:
             return
         shape.insertPoint(index, point)
+        self.shapeIndex.update(shape)
         shape.highlightVertex(index, shape.MOVE_VERTEX)
         self.hShape = shape
         self.hVertex = index
@@ -340,6 +375,7 @@ class Canvas(QtWidgets.QWidget):
         if shape is None or index is None:
             return
         shape.removePoint(index)
+        self.shapeIndex.update(shape)
         shape.highlightClear()
         self.hShape = shape
         self.prevhVertex = None
@@ -350,6 +386,8 @@ class Canvas(QtWidgets.QWidget):
             pos = self.transformPos(ev.localPos())
         else:
             pos = self.transformPos(ev.posF())
+        if self.editing():
+            self.materializeHighlightedRow()
         if ev.button() == QtCore.Qt.LeftButton:
             if self.drawing():
                 if self.current:
@@ -394,7 +432,7 @@ class Canvas(QtWidgets.QWidget):
                 group_mode = int(ev.modifiers()) == QtCore.Qt.ControlModifier
                 self.selectShapePoint(pos, multiple_selection_mode=group_mode)
                 self.prevPoint = pos
-                self.repaint()
+                self.update()
         elif ev.button() == QtCore.Qt.RightButton and self.editing():
             group_mode = int(ev.modifiers()) == QtCore.Qt.ControlModifier
             if not self.selectedShapes or (
@@ -402,7 +440,7 @@ class Canvas(QtWidgets.QWidget):
                 and self.hShape not in self.selectedShapes
             ):
                 self.selectShapePoint(pos, multiple_selection_mode=group_mode)
-                self.repaint()
+                self.update()
             self.prevPoint = pos
 
     def mouseReleaseEvent(self, ev):
@@ -414,8 +452,9 @@ class Canvas(QtWidgets.QWidget):
                 and self.selectedShapesCopy
             ):
                 # Cancel the move by deleting the shadow copy.
+                dirty = self.shapesRect(self.selectedShapesCopy)
                 self.selectedShapesCopy = []
-                self.repaint()
+                self.update(dirty)
         elif ev.button() == QtCore.Qt.LeftButton:
             if self.editing():
                 if (
@@ -444,13 +483,15 @@ class Canvas(QtWidgets.QWidget):
         if copy:
             for i, shape in enumerate(self.selectedShapesCopy):
                 self.shapes.append(shape)
+                self.shapeIndex.insert(shape)
                 self.selectedShapes[i].selected = False
                 self.selectedShapes[i] = shape
         else:
             for i, shape in enumerate(self.selectedShapesCopy):
                 self.selectedShapes[i].points = shape.points
+                self.shapeIndex.update(self.selectedShapes[i])
         self.selectedShapesCopy = []
-        self.repaint()
+        self.update()
         self.storeShapes()
         return True
 
@@ -490,7 +531,9 @@ class Canvas(QtWidgets.QWidget):
             index, shape = self.hVertex, self.hShape
             shape.highlightVertex(index, shape.MOVE_VERTEX)
         else:
-            for shape in reversed(self.shapes):
+            for shape in itertools.chain(
+                self.shapeIndex.query(point), self.storeHits(point)
+            ):
                 if self.isVisible(shape) and shape.containsPoint(point):
                     self.setHiding()
                     if shape not in self.selectedShapes:
@@ -527,7 +570,7 @@ class Canvas(QtWidgets.QWidget):
         y1 = top - point.y()
         x2 = right - point.x()
         y2 = bottom - point.y()
-        self.offsets = QtCore.QPoint(x1, y1), QtCore.QPoint(x2, y2)
+        self.offsets = QtCore.QPointF(x1, y1), QtCore.QPointF(x2, y2)
 
     def boundedMoveVertex(self, pos):
         index, shape = self.hVertex, self.hShape
@@ -535,6 +578,7 @@ class Canvas(QtWidgets.QWidget):
         if self.outOfPixmap(pos):
             pos = self.intersectionPoint(point, pos)
         shape.moveVertexBy(index, pos - point)
+        self.shapeIndex.update(shape)
 
     def boundedMoveShapes(self, shapes, pos):
         if self.outOfPixmap(pos):
@@ -557,6 +601,7 @@ class Canvas(QtWidgets.QWidget):
         if dp:
             for shape in shapes:
                 shape.moveBy(dp)
+                self.shapeIndex.update(shape)
             self.prevPoint = pos
             return True
         return False
@@ -573,6 +618,8 @@ class Canvas(QtWidgets.QWidget):
         if self.selectedShapes:
             for shape in self.selectedShapes:
                 self.shapes.remove(shape)
+                self.shapeIndex.remove(shape)
+                self._deleteFromStore(shape)
                 deleted_shapes.append(shape)
             self.storeShapes()
             self.selectedShapes = []
@@ -584,9 +631,17 @@ class Canvas(QtWidgets.QWidget):
             self.selectedShapes.remove(shape)
         if shape in self.shapes:
             self.shapes.remove(shape)
+            self.shapeIndex.remove(shape)
+            self._deleteFromStore(shape)
         self.storeShapes()
         self.update()
 
+    def _deleteFromStore(self, shape):
+        if self.store is not None:
+            row = self.store.rowOf(shape)
+            if row is not None:
+                self.store.delete(row)
+
     def duplicateSelectedShapes(self):
         if self.selectedShapes:
             self.selectedShapesCopy = [s.copy() for s in self.selectedShapes]
@@ -617,14 +672,40 @@ class Canvas(QtWidgets.QWidget):
         p.scale(self.scale, self.scale)
         p.translate(self.offsetToCenter())
 
-        p.drawPixmap(0, 0, self.pixmap)
+        # only the exposed part of the image, from the matching pyramid level
+        exposed = p.worldTransform().inverted()[0].mapRect(
+            QtCore.QRectF(event.rect())
+        )
+        if self.pyramid is not None:
+            self.pyramid.draw(p, exposed, self.scale)
         Shape.scale = self.scale
+        # skip shapes outside the exposed area; bounds are widened by the
+        # vertex marker size, which also gives points and straight lines
+        # (whose bounds have no area) something to intersect with
+        margin = (2 * Shape.point_size + 2) / self.scale
+        lod_rects = {}  # line color -> [QRectF]
+        if self.store is not None and not self._hideBackround:
+            self.paintStore(
+                p, exposed.adjusted(-margin, -margin, margin, margin), lod_rects
+            )
+            self.paintHighlightedRow(p)
         for shape in self.shapes:
-            if (shape.selected or not self._hideBackround) and self.isVisible(
-                shape
+            if (
+                (shape.selected or not self._hideBackround)
+                and self.isVisible(shape)
+                and shape.boundingRect()
+                .adjusted(-margin, -margin, margin, margin)
+                .intersects(exposed)
             ):
                 shape.fill = shape.selected or shape == self.hShape
-                shape.paint(p)
+                if not shape.fill and self.isLowDetail(shape):
+                    lod_rects.setdefault(shape.line_color.rgba(), []).append(
+                        shape.boundingRect()
+                    )
+                else:
+                    shape.paint(p)
+        if lod_rects:
+            self.paintLowDetail(p, lod_rects)
         if self.current:
             self.current.paint(p)
             self.line.paint(p)
@@ -645,6 +726,109 @@ class Canvas(QtWidgets.QWidget):
 
         p.end()
 
+    def paintStore(self, p, exposed, lod_rects):
+        """Draw result-store boxes that have no Shape yet, batched per color.
+
+        Small boxes are added to ``lod_rects``; the others get the same
+        outline and corner markers ``Shape.paint`` would draw.
+        """
+        rows = self.store.drawableRows(
+            (exposed.left(), exposed.top(), exposed.right(), exposed.bottom())
+        )
+        if not len(rows):
+            return
+        boxes = self.store.boxes[rows]
+        colors = self.store.colors[rows].astype(np.uint32)
+        rgba = (0xFF << 24) | (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+        size = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+        small = size * self.scale < self.lod_size if self.lod_size else np.zeros(len(rows), bool)
+
+        detailed = {}
+        for (x1, y1, x2, y2), color, is_small in zip(boxes.tolist(), rgba.tolist(), small):
+            rect = QtCore.QRectF(x1, y1, x2 - x1, y2 - y1)
+            target = lod_rects if is_small else detailed
+            target.setdefault(color, []).append(rect)
+
+        for color, rects in detailed.items():
+            qcolor = QtGui.QColor.fromRgba(color)
+            pen = QtGui.QPen(qcolor)
+            pen.setWidth(max(1, int(round(2.0 / self.scale))))
+            p.setPen(pen)
+            p.setBrush(QtCore.Qt.NoBrush)
+            p.drawRects(rects)
+            marker = QtGui.QPen(qcolor)
+            marker.setWidthF(Shape.point_size / self.scale)
+            marker.setCapStyle(QtCore.Qt.RoundCap)
+            p.setPen(marker)
+            corners = []
+            for rect in rects:
+                corners.append(rect.topLeft())
+                corners.append(rect.bottomRight())
+            p.drawPoints(QtGui.QPolygonF(corners))
+
+    def isLowDetail(self, shape):
+        # points are only their vertex marker
+        if not self.lod_size or shape.shape_type == "point":
+            return False
+        rect = shape.boundingRect()
+        return max(rect.width(), rect.height()) * self.scale < self.lod_size
+
+    def paintLowDetail(self, p, lod_rects):
+        """Draw small shapes as outlines only: one drawRects call per color,
+        no vertex markers and no antialiasing."""
+        p.save()
+        p.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        p.setRenderHint(QtGui.QPainter.HighQualityAntialiasing, False)
+        p.setBrush(QtCore.Qt.NoBrush)
+        for rgba, rects in lod_rects.items():
+            pen = QtGui.QPen(QtGui.QColor.fromRgba(rgba))
+            pen.setCosmetic(True)
+            pen.setWidth(1)
+            p.setPen(pen)
+            p.drawRects(rects)
+        p.restore()
+
+    def shapesRect(self, shapes):
+        """Widget-coordinate rect covering ``shapes`` and their vertex markers."""
+        bounds = [
+            shape.boundingRect()
+            for shape in shapes
+            if shape is not None and shape.points
+        ]
+        if not bounds:
+            return QtCore.QRect()
+        # not QRectF.united, which drops the empty bounds of points
+        x1 = min(r.left() for r in bounds)
+        y1 = min(r.top() for r in bounds)
+        x2 = max(r.right() for r in bounds)
+        y2 = max(r.bottom() for r in bounds)
+        return self.toWidgetRect(QtCore.QRectF(x1, y1, x2 - x1, y2 - y1))
+
+    def toWidgetRect(self, rect):
+        """Map an image-coordinate QRectF, plus vertex marker margin, to
+        the widget."""
+        if not self.pixmap:
+            return QtCore.QRect()
+        margin = (2 * Shape.point_size + 2) / self.scale
+        rect = rect.adjusted(-margin, -margin, margin, margin)
+        offset = self.offsetToCenter()
+        s = self.scale
+        return QtCore.QRectF(
+            (rect.x() + offset.x()) * s,
+            (rect.y() + offset.y()) * s,
+            rect.width() * s,
+            rect.height() * s,
+        ).toAlignedRect()
+
+    def updateShapes(self, shapes, dirty=None):
+        """Schedule a repaint of ``shapes`` plus the ``dirty`` rect they
+        occupied before a change; Qt coalesces pending update regions."""
+        rect = self.shapesRect(shapes)
+        if dirty is not None:
+            rect = rect.united(dirty)
+        if not rect.isEmpty():
+            self.update(rect)
+
     def transformPos(self, point):
         """Convert from widget-logical coordinates to painter-logical ones."""
         return point / self.scale - self.offsetToCenter()
@@ -666,6 +850,7 @@ class Canvas(QtWidgets.QWidget):
         assert self.current
         self.current.close()
         self.shapes.append(self.current)
+        self.shapeIndex.insert(self.current)
         self.storeShapes()
         self.current = None
         self.setHiding(False)
@@ -775,10 +960,11 @@ class Canvas(QtWidgets.QWidget):
 
     def moveByKeyboard(self, offset):
         if self.selectedShapes:
+            dirty = self.shapesRect(self.selectedShapes)
             self.boundedMoveShapes(
                 self.selectedShapes, self.prevPoint + offset
             )
-            self.repaint()
+            self.updateShapes(self.selectedShapes, dirty)
             self.movingShape = True
 
     def keyPressEvent(self, ev):
@@ -831,6 +1017,7 @@ class Canvas(QtWidgets.QWidget):
     def undoLastLine(self):
         assert self.shapes
         self.current = self.shapes.pop()
+        self.shapeIndex.remove(self.current)
         self.current.setOpen()
         if self.createMode in ["polygon", "linestrip"]:
             self.line.points = [self.current[-1], self.current[0]]
@@ -853,26 +1040,155 @@ class Canvas(QtWidgets.QWidget):
 
     def loadPixmap(self, pixmap, clear_shapes=True):
         self.pixmap = pixmap
+        self.pyramid = ImagePyramid(pixmap)
         if clear_shapes:
             self.shapes = []
+            self.shapeIndex.clear()
+            self.store = None
         self.update()
 
     def loadShapes(self, shapes, replace=True):
         if replace:
             self.shapes = list(shapes)
+            self.shapeIndex.rebuild(self.shapes)
         else:
             self.shapes.extend(shapes)
+            for shape in shapes:
+                self.shapeIndex.insert(shape)
         self.storeShapes()
         self.current = None
         self.hShape = None
         self.hVertex = None
         self.hEdge = None
+        self.hRow = self.hRowVertex = None
+        self.update()
+
+    def reorder(self, shapes, rows=None):
+        """Paint ``shapes`` (and the store ``rows`` that have no Shape yet)
+        in the given order, last on top. Unlike loadShapes this neither
+        creates shapes nor takes an undo snapshot."""
+        listed = set(shapes)
+        self.shapes = [s for s in self.shapes if s not in listed] + list(shapes)
+        self.shapeIndex.rebuild(self.shapes)
+        if rows is not None and self.store is not None:
+            self.store.setOrder(rows)
         self.update()
 
     def setShapeVisible(self, shape, value):
         self.visible[shape] = value
         self.update()
 
+    def loadStore(self, store):
+        """Show the boxes of an ``OCRResultStore``; a box gets a real Shape
+        (added to ``self.shapes``) only once it is hovered or clicked."""
+        self.store = store
+        self.hRow = self.hRowVertex = None
+        if store is not None:
+            store.on_materialize = self._onMaterialize
+        self.update()
+
+    def _onMaterialize(self, row, shape):
+        self.shapes.append(shape)
+        self.shapeIndex.insert(shape)
+        # keep the undo snapshot aligned with self.shapes
+        if self.shapesBackups:
+            self.shapesBackups[-1].append(shape.copy())
+        self.visible[shape] = bool(self.store.visible[row])
+
+    def setRowVisible(self, row, value):
+        if self.store is not None:
+            self.store.visible[row] = value
+            self.update()
+
+    def storeHits(self, point, radius=0.0):
+        """Shapes for the store boxes under ``point``, topmost first. A row
+        is only materialized once iteration reaches it."""
+        if self.store is None:
+            return
+        for row in self.store.hitTest(point.x(), point.y(), radius):
+            yield self.store.shape(row)
+
+    def highlightStoreRow(self, pos):
+        """Highlight the store box (or its corner) under ``pos`` without
+        creating a Shape for it. Returns False if there is none."""
+        if self.store is None:
+            return False
+        epsilon = self.epsilon / self.scale
+        for row in self.store.hitTest(pos.x(), pos.y(), epsilon):
+            x1, y1, x2, y2 = self.store.boxes[row].tolist()
+            corners = [QtCore.QPointF(x1, y1), QtCore.QPointF(x2, y2)]
+            dists = [distance(corner - pos) for corner in corners]
+            index = 0 if dists[0] <= dists[1] else 1
+            if dists[index] > epsilon:
+                index = None
+                if not (x1 <= pos.x() <= x2 and y1 <= pos.y() <= y2):
+                    continue
+            if self.hShape:
+                self.hShape.highlightClear()
+                self.updateShapes([self.hShape])
+            self.prevhShape = self.hShape
+            self.prevhVertex = self.hVertex
+            self.prevhEdge = self.hEdge
+            self.hShape = self.hVertex = self.hEdge = None
+            self.hRow, self.hRowVertex = row, index
+            if index is not None:
+                self.overrideCursor(CURSOR_POINT)
+                self.setToolTip(self.tr("Click & drag to move point"))
+            else:
+                self.overrideCursor(CURSOR_GRAB)
+                self.setToolTip(
+                    self.tr("Click & drag to move shape '%s'")
+                    % self.store.label(row)
+                )
+            self.setStatusTip(self.toolTip())
+            self.update(self.rowRect(row))
+            return True
+        return False
+
+    def unHighlightRow(self):
+        if self.hRow is not None:
+            self.update(self.rowRect(self.hRow))
+        self.hRow = self.hRowVertex = None
+
+    def materializeHighlightedRow(self):
+        """Create the Shape of the highlighted store box so that clicking
+        selects, moves or edits it like any other shape."""
+        if self.hRow is None or self.store is None:
+            return
+        row, index = self.hRow, self.hRowVertex
+        self.hRow = self.hRowVertex = None
+        shape = self.store.shape(row)
+        self.prevhShape = self.hShape = shape
+        self.prevhVertex = self.hVertex = index
+        if index is not None:
+            shape.highlightVertex(index, shape.MOVE_VERTEX)
+
+    def rowRect(self, row):
+        """Widget-coordinate rect covering store box ``row``."""
+        x1, y1, x2, y2 = self.store.boxes[row].tolist()
+        return self.toWidgetRect(QtCore.QRectF(x1, y1, x2 - x1, y2 - y1))
+
+    def paintHighlightedRow(self, p):
+        """Hover highlight of a store box, as ``Shape.paint`` draws a
+        highlighted shape: translucent fill, enlarged white corner."""
+        row = self.hRow
+        if row is None or not self.store.visible[row] or self.store.deleted[row]:
+            return
+        if self.store.materializedMask[row]:
+            return
+        x1, y1, x2, y2 = self.store.boxes[row].tolist()
+        r, g, b = self.store.colors[row].tolist()
+        p.fillRect(QtCore.QRectF(x1, y1, x2 - x1, y2 - y1), QtGui.QColor(r, g, b, 128))
+        if self.hRowVertex is not None:
+            corner = QtCore.QPointF(*((x1, y1), (x2, y2))[self.hRowVertex])
+            # Shape's MOVE_VERTEX highlight: a square 1.5 times the point size
+            d = Shape.point_size / self.scale * 1.5
+            path = QtGui.QPainterPath()
+            path.addRect(corner.x() - d / 2, corner.y() - d / 2, d, d)
+            p.setPen(QtGui.QPen(QtGui.QColor(r, g, b)))
+            p.drawPath(path)
+            p.fillPath(path, QtGui.QColor(255, 255, 255))
+
     def overrideCursor(self, cursor):
         self.restoreCursor()
         self._cursor = cursor
@@ -884,5 +1200,6 @@ class Canvas(QtWidgets.QWidget):
     def resetState(self):
         self.restoreCursor()
         self.pixmap = None
+        self.pyramid = None
         self.shapesBackups = []
         self.update()
@@ -0,0 +1,76 @@
+import math
+
+from PyQt5 import QtCore
+
+
+class ImagePyramid(object):
+    """Multi-resolution, tiled view of a pixmap for fast painting.
+
+    Level ``k`` is the image downscaled by ``2 ** k``; levels are built
+    lazily (each from the previous one) the first time they are needed.
+    ``draw`` paints only the tiles of the level matching the current scale
+    that intersect the exposed rectangle. Images no larger than
+    ``min_size`` are painted directly.
+    """
+
+    def __init__(self, pixmap, tile_size=1024, min_size=2048):
+        self.tile_size = tile_size
+        self.levels = [pixmap]
+        self.enabled = max(pixmap.width(), pixmap.height()) > min_size
+
+    def level(self, k):
+        while len(self.levels) <= k:
+            prev = self.levels[-1]
+            self.levels.append(
+                prev.scaled(
+                    max(1, prev.width() // 2),
+                    max(1, prev.height() // 2),
+                    QtCore.Qt.IgnoreAspectRatio,
+                    QtCore.Qt.SmoothTransformation,
+                )
+            )
+        return self.levels[k]
+
+    def levelForScale(self, scale):
+        # coarsest level that still has at least one pixel per screen pixel
+        if scale >= 1 or scale <= 0:
+            return 0
+        k = int(math.floor(math.log2(1.0 / scale)))
+        full = self.levels[0]
+        # stop before levels shrink to a single tile
+        max_k = max(0, int(math.log2(max(full.width(), full.height(), 1) / self.tile_size)))
+        return min(k, max_k)
+
+    def draw(self, painter, rect, scale):
+        """Paint the part of the image inside ``rect`` (image coordinates)."""
+        full = self.levels[0]
+        if not self.enabled:
+            painter.drawPixmap(0, 0, full)
+            return
+
+        pixmap = self.level(self.levelForScale(scale))
+        fx = pixmap.width() / float(full.width())
+        fy = pixmap.height() / float(full.height())
+        ts = self.tile_size
+        rect = QtCore.QRectF(rect).intersected(QtCore.QRectF(full.rect()))
+        if rect.isEmpty():
+            return
+        tx0 = int(rect.left() * fx) // ts
+        ty0 = int(rect.top() * fy) // ts
+        tx1 = min(int(math.ceil(rect.right() * fx)), pixmap.width() - 1) // ts
+        ty1 = min(int(math.ceil(rect.bottom() * fy)), pixmap.height() - 1) // ts
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                source = QtCore.QRectF(
+                    tx * ts,
+                    ty * ts,
+                    min(ts, pixmap.width() - tx * ts),
+                    min(ts, pixmap.height() - ty * ts),
+                )
+                target = QtCore.QRectF(
+                    source.x() / fx,
+                    source.y() / fy,
+                    source.width() / fx,
+                    source.height() / fy,
+                )
+                painter.drawPixmap(target, pixmap, source)
@@ -1,3 +1,5 @@
+import numpy as np
+
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt
 from PyQt5 import QtGui
@@ -5,12 +7,30 @@ from PyQt5.QtGui import QPalette
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QStyle
 
+from ..utils.lru_cache import LRUCache
+from ..utils.qt import selectRows
+from .result_list_model import COLOR_ROLE
+from .result_list_model import STORE_ROW_ROLE
+from .result_list_model import ResultListModel
+
 
 # https://stackoverflow.com/a/2039745/4158863
 class HTMLDelegate(QtWidgets.QStyledItemDelegate):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, max_layouts=1024):
         super(HTMLDelegate, self).__init__()
         self.doc = QtGui.QTextDocument(self)
+        # html -> laid out QTextDocument, so scrolling does not re-parse rows
+        self._docs = LRUCache(
+            max_items=max_layouts, on_evict=lambda html, doc: doc.deleteLater()
+        )
+
+    def document(self, html):
+        doc = self._docs.get(html)
+        if doc is None:
+            doc = QtGui.QTextDocument(self)
+            doc.setHtml(html)
+            self._docs.put(html, doc)
+        return doc
 
     def paint(self, painter, option, index):
         painter.save()
@@ -18,7 +38,11 @@ class HTMLDelegate(QtWidgets.QStyledItemDelegate):
         options = QtWidgets.QStyleOptionViewItem(option)
 
         self.initStyleOption(options, index)
-        self.doc.setHtml(options.text)
+        html = options.text
+        color = index.data(COLOR_ROLE)
+        if color is not None:
+            html = '{} <font color="{}">●</font>'.format(html, color.name())
+        doc = self.document(html)
         options.text = ""
 
         style = (
@@ -55,7 +79,7 @@ class HTMLDelegate(QtWidgets.QStyledItemDelegate):
 
         painter.translate(textRect.topLeft())
         painter.setClipRect(textRect.translated(-textRect.topLeft()))
-        self.doc.documentLayout().draw(painter, ctx)
+        doc.documentLayout().draw(painter, ctx)
 
         painter.restore()
 
@@ -66,25 +90,88 @@ class HTMLDelegate(QtWidgets.QStyledItemDelegate):
         return QtCore.QSize(width, height)
 
 
-class LabelListWidgetItem(QtGui.QStandardItem):
-    def __init__(self, text=None, shape=None):
-        super(LabelListWidgetItem, self).__init__()
-        self.setText(text or "")
-        self.setShape(shape)
+class LabelListWidgetItem(object):
+    """A row of LabelListWidget.
 
-        self.setCheckable(True)
-        self.setCheckState(Qt.Checked)
-        self.setEditable(False)
-        self.setTextAlignment(Qt.AlignBottom)
+    Items for hand-drawn shapes hold their shape, text, color and check
+    state. Items for OCRResultStore rows are created by the model only when
+    asked for and read those from the store; the row's Shape is created
+    when ``shape()`` needs it.
+    """
 
-    def clone(self):
-        return LabelListWidgetItem(self.text(), self.shape())
+    def __init__(self, text=None, shape=None, row=None, color=None):
+        self._text = text
+        self._shape = shape
+        self._row = row
+        self._color = color
+        self._checked = True
+        self._model = None
 
-    def setShape(self, shape):
-        self.setData(shape, Qt.UserRole)
+    def model(self):
+        return self._model
+
+    def store(self):
+        return self._model.store if self._model is not None else None
+
+    def storeRow(self):
+        return self._row
+
+    def text(self):
+        if self._text is None and self._row is not None and self.store() is not None:
+            return storeRowText(self.store(), self._row)
+        return self._text or ""
+
+    def setText(self, text):
+        self._text = text
+        self._emitDataChanged()
 
-    def shape(self):
-        return self.data(Qt.UserRole)
+    def color(self):
+        if self._row is not None and self.store() is not None:
+            return QtGui.QColor(*self.store().colors[self._row].tolist())
+        if self._color is None:
+            return None
+        return QtGui.QColor(*self._color)
+
+    def setColor(self, rgb):
+        if self._row is not None and self.store() is not None:
+            self.store().colors[self._row] = rgb
+        else:
+            self._color = tuple(rgb)
+        self._emitDataChanged()
+
+    def checkState(self):
+        if self._row is not None and self.store() is not None:
+            checked = self.store().visible[self._row]
+        else:
+            checked = self._checked
+        return Qt.Checked if checked else Qt.Unchecked
+
+    def setCheckState(self, state):
+        if self._model is None:
+            self._checked = state == Qt.Checked
+        else:
+            self._model.setData(
+                self._model.indexFromItem(self), state, Qt.CheckStateRole
+            )
+
+    def setShape(self, shape):
+        self._shape = shape
+
+    def shape(self, materialize=True):
+        shape = self._shape
+        if shape is None:
+            row, store = self._row, self.store()
+            if row is not None and store is not None:
+                shape = store.materialized(row)
+                if shape is None and materialize:
+                    shape = store.shape(row)
+        return shape
+
+    def _emitDataChanged(self):
+        if self._model is not None:
+            index = self._model.indexFromItem(self)
+            if index.isValid():
+                self._model.dataChanged.emit(index, index)
 
     def __hash__(self):
         return id(self)
@@ -93,14 +180,215 @@ class LabelListWidgetItem(QtGui.QStandardItem):
         return '{}("{}")'.format(self.__class__.__name__, self.text())
 
 
-class StandardItemModel(QtGui.QStandardItemModel):
+def storeRowText(store, row):
+    return "{} ({})".format(store.label(row), row)
+
 
+class LabelListModel(ResultListModel):
+    """Label panel model over the OCRResultStore the result panel reads.
+
+    Rows show the box label instead of the recognized text, the check state
+    is the store's ``visible`` flag and ``COLOR_ROLE`` the box color. The
+    panel also lists hand-drawn shapes and can be reordered, so its rows are
+    a list of entries: a store row number, or the LabelListWidgetItem of a
+    shape outside the store. Items for store rows are made on request only.
+    """
+
+    itemChanged = QtCore.pyqtSignal(object)
     itemDropped = QtCore.pyqtSignal()
 
-    def removeRows(self, *args, **kwargs):
-        ret = super().removeRows(*args, **kwargs)
+    def __init__(self, parent=None):
+        super(LabelListModel, self).__init__(parent)
+        self._entries = []
+        self._items = {}  # store row -> LabelListWidgetItem
+        self._storePos = np.zeros(0, dtype=np.int64)  # store row -> list row, -1 if removed
+        self._itemPos = {}  # item of a hand-drawn shape -> list row
+
+    def setStore(self, store):
+        self.beginResetModel()
+        self.store = store
+        n = len(store) if store is not None else 0
+        self._entries = list(range(n))
+        self._items = {}
+        self._storePos = np.arange(n)
+        self._itemPos = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        if not isinstance(entry, int):
+            if role == Qt.DisplayRole:
+                return entry.text()
+            if role == Qt.CheckStateRole:
+                return entry.checkState()
+            if role == COLOR_ROLE:
+                return entry.color()
+            return None
+        if role == Qt.DisplayRole:
+            item = self._items.get(entry)
+            if item is not None and item._text is not None:
+                return item._text
+            return storeRowText(self.store, entry)
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.store.visible[entry] else Qt.Unchecked
+        if role == COLOR_ROLE:
+            return QtGui.QColor(*self.store.colors[entry].tolist())
+        if role == STORE_ROW_ROLE:
+            return entry
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        checked = value == Qt.Checked
+        entry = self._entries[index.row()]
+        if isinstance(entry, int):
+            self.store.visible[entry] = checked
+        else:
+            entry._checked = checked
+        self.dataChanged.emit(index, index, [role])
+        self.itemChanged.emit(self.item(index.row()))
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            # drop between rows, never onto one
+            return Qt.ItemIsDropEnabled
+        return (
+            Qt.ItemIsSelectable
+            | Qt.ItemIsUserCheckable
+            | Qt.ItemIsEnabled
+            | Qt.ItemIsDragEnabled
+        )
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def item(self, row):
+        entry = self._entries[row]
+        if isinstance(entry, int):
+            return self.itemForStoreRow(entry)
+        return entry
+
+    def itemForStoreRow(self, row):
+        if row is None or row >= len(self._storePos) or self._storePos[row] < 0:
+            return None
+        item = self._items.get(row)
+        if item is None:
+            item = LabelListWidgetItem(row=row)
+            item._model = self
+            self._items[row] = item
+        return item
+
+    def rowOfItem(self, item):
+        if item.storeRow() is not None:
+            row = item.storeRow()
+            return int(self._storePos[row]) if row < len(self._storePos) else -1
+        return self._itemPos.get(item, -1)
+
+    def indexFromItem(self, item):
+        row = self.rowOfItem(item)
+        return self.index(row) if row >= 0 else QtCore.QModelIndex()
+
+    def addItems(self, items):
+        if not items:
+            return
+        first = len(self._entries)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(items) - 1)
+        for row, item in enumerate(items, first):
+            item._model = self
+            self._entries.append(item)
+            self._itemPos[item] = row
+        self.endInsertRows()
+
+    def removeItem(self, item):
+        row = self.rowOfItem(item)
+        if row < 0:
+            return
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._entries[row]
+        self._reindex()
+        self.endRemoveRows()
+
+    def moveRowsTo(self, rows, target):
+        """Move the list rows ``rows`` so they start at ``target`` (a row
+        index counted before the move), keeping their order and the
+        selection."""
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        moved = set(rows)
+        order = [row for row in range(len(self._entries)) if row not in moved]
+        target -= sum(1 for row in rows if row < target)
+        order[target:target] = rows
+        if order == list(range(len(order))):
+            return
+        newRow = np.empty(len(order), dtype=np.int64)
+        newRow[order] = np.arange(len(order))
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        self._entries = [self._entries[row] for row in order]
+        self._reindex()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(int(newRow[index.row()])) for index in persistent],
+        )
+        self.layoutChanged.emit()
         self.itemDropped.emit()
-        return ret
+
+    def _reindex(self):
+        self._storePos = np.full(len(self.store) if self.store is not None else 0, -1)
+        self._itemPos = {}
+        for row, entry in enumerate(self._entries):
+            if isinstance(entry, int):
+                self._storePos[entry] = row
+            else:
+                self._itemPos[entry] = row
+
+    def setAllChecked(self, value):
+        """Check or uncheck every row with one dataChanged. ``itemChanged``
+        is only emitted for rows that have a Shape."""
+        if not self._entries:
+            return
+        if self.store is not None:
+            self.store.visible[:] = value
+        for item in self._itemPos:
+            item._checked = value
+        self.dataChanged.emit(
+            self.index(0), self.index(len(self._entries) - 1), [Qt.CheckStateRole]
+        )
+        items = list(self._itemPos)
+        if self.store is not None:
+            items += [
+                self.itemForStoreRow(row)
+                for row in np.flatnonzero(self.store.materializedMask).tolist()
+            ]
+        for item in items:
+            if item is not None:
+                self.itemChanged.emit(item)
+
+    def paintOrder(self):
+        """Existing shapes and the store rows without one, in list order."""
+        shapes, rows = [], []
+        for entry in self._entries:
+            if isinstance(entry, int):
+                shape = self.store.materialized(entry)
+                if shape is None:
+                    rows.append(entry)
+                    continue
+            else:
+                shape = entry.shape(materialize=False)
+            if shape is not None:
+                shapes.append(shape)
+        return shapes, rows
 
 
 class LabelListWidget(QtWidgets.QListView):
@@ -111,11 +399,14 @@ class LabelListWidget(QtWidgets.QListView):
     def __init__(self):
         super(LabelListWidget, self).__init__()
         self._selectedItems = []
+        # hand-drawn shape -> item; store shapes are found by store row
+        self._itemsByShape = {}
 
         self.setWindowFlags(Qt.Window)
-        self.setModel(StandardItemModel())
-        self.model().setItemPrototype(LabelListWidgetItem())
+        self.setModel(LabelListModel(self))
         self.setItemDelegate(HTMLDelegate())
+        # all rows share the delegate's size hint
+        self.setUniformItemSizes(True)
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
         self.setDefaultDropAction(Qt.MoveAction)
@@ -144,41 +435,87 @@ class LabelListWidget(QtWidgets.QListView):
         return self.model().itemChanged
 
     def itemSelectionChangedEvent(self, selected, deselected):
-        selected = [self.model().itemFromIndex(i) for i in selected.indexes()]
-        deselected = [
-            self.model().itemFromIndex(i) for i in deselected.indexes()
-        ]
+        selected = [self.model().item(i.row()) for i in selected.indexes()]
+        deselected = [self.model().item(i.row()) for i in deselected.indexes()]
         self.itemSelectionChanged.emit(selected, deselected)
 
     def itemDoubleClickedEvent(self, index):
-        self.itemDoubleClicked.emit(self.model().itemFromIndex(index))
+        self.itemDoubleClicked.emit(self.model().item(index.row()))
+
+    def dropEvent(self, event):
+        # move the rows inside the model; the default drop inserts copies
+        # and then removes the originals, so rows would exist twice
+        if event.source() is not self:
+            return super(LabelListWidget, self).dropEvent(event)
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            target = len(self)
+        elif event.pos().y() > self.visualRect(index).center().y():
+            target = index.row() + 1
+        else:
+            target = index.row()
+        self.model().moveRowsTo([i.row() for i in self.selectedIndexes()], target)
+        # the rows are already moved, leave nothing for startDrag to remove
+        event.setDropAction(Qt.CopyAction)
+        event.accept()
 
     def selectedItems(self):
-        return [self.model().itemFromIndex(i) for i in self.selectedIndexes()]
+        return [self.model().item(i.row()) for i in self.selectedIndexes()]
 
     def scrollToItem(self, item):
         self.scrollTo(self.model().indexFromItem(item))
 
     def addItem(self, item):
-        if not isinstance(item, LabelListWidgetItem):
-            raise TypeError("item must be LabelListWidgetItem")
-        self.model().setItem(self.model().rowCount(), 0, item)
-        item.setSizeHint(self.itemDelegate().sizeHint(None, None))
+        self.addItems([item])
+
+    def addItems(self, items):
+        """Append items of hand-drawn shapes in one rowsInserted."""
+        for item in items:
+            if not isinstance(item, LabelListWidgetItem):
+                raise TypeError("item must be LabelListWidgetItem")
+        self.model().addItems(items)
+        for item in items:
+            shape = item.shape(materialize=False)
+            if shape is not None:
+                self._itemsByShape[shape] = item
 
     def removeItem(self, item):
-        index = self.model().indexFromItem(item)
-        self.model().removeRows(index.row(), 1)
+        shape = item.shape(materialize=False)
+        if self._itemsByShape.get(shape) is item:
+            del self._itemsByShape[shape]
+        self.model().removeItem(item)
 
     def selectItem(self, item):
         index = self.model().indexFromItem(item)
         self.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
 
+    def selectItems(self, items, scroll=True):
+        """Replace the selection with items in a single selection change."""
+        selectRows(self, [self.model().rowOfItem(item) for item in items], scroll)
+
+    def itemForStoreRow(self, row):
+        return self.model().itemForStoreRow(row)
+
     def findItemByShape(self, shape):
-        for row in range(self.model().rowCount()):
-            item = self.model().item(row, 0)
-            if item.shape() == shape:
-                return item
-        raise ValueError("cannot find shape: {}".format(shape))
+        item = self._itemsByShape.get(shape)
+        if item is None and self.model().store is not None:
+            item = self.model().itemForStoreRow(self.model().store.rowOf(shape))
+        if item is None:
+            raise ValueError("cannot find shape: {}".format(shape))
+        return item
+
+    def rowOfItem(self, item):
+        return self.model().rowOfItem(item)
+
+    def setAllChecked(self, value):
+        self.model().setAllChecked(value)
+
+    def paintOrder(self):
+        return self.model().paintOrder()
+
+    def setStore(self, store):
+        self.model().setStore(store)
 
     def clear(self):
         self.model().clear()
+        self._itemsByShape = {}
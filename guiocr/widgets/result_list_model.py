@@ -0,0 +1,131 @@
+import numpy as np
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt
+from PyQt5 import QtGui
+from PyQt5 import QtWidgets
+
+from ..utils.qt import selectRows
+
+
+# row of the OCRResultStore a list row stands for, and that box's color
+STORE_ROW_ROLE = Qt.UserRole + 1
+COLOR_ROLE = Qt.UserRole + 2
+
+
+class ResultListModel(QtCore.QAbstractListModel):
+    """List model reading the texts of an OCRResultStore.
+
+    No per-row item objects are created: display data is read from the
+    store when the view asks for it, so loading a page is a single model
+    reset regardless of the number of lines.
+    """
+
+    def __init__(self, parent=None):
+        super(ResultListModel, self).__init__(parent)
+        self.store = None
+        self._checked = np.zeros(0, dtype=bool)
+
+    def setStore(self, store):
+        self.beginResetModel()
+        self.store = store
+        self._checked = np.ones(len(store) if store is not None else 0, dtype=bool)
+        self.endResetModel()
+
+    def clear(self):
+        self.setStore(None)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid() or self.store is None:
+            return 0
+        return len(self.store)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.store is None:
+            return None
+        row = index.row()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.store.text(row)
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._checked[row] else Qt.Unchecked
+        if role == STORE_ROW_ROLE:
+            return row
+        if role == COLOR_ROLE:
+            return QtGui.QColor(*self.store.colors[row].tolist())
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or self.store is None:
+            return False
+        row = index.row()
+        if role == Qt.EditRole:
+            self.store.setText(row, str(value))
+        elif role == Qt.CheckStateRole:
+            self._checked[row] = value == Qt.Checked
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return (
+            Qt.ItemIsEditable
+            | Qt.ItemIsSelectable
+            | Qt.ItemIsUserCheckable
+            | Qt.ItemIsEnabled
+        )
+
+    def text(self, row):
+        return self.store.text(row)
+
+    def setTexts(self, start, texts):
+        """Replace the texts of rows start.. and emit one dataChanged."""
+        if self.store is None:
+            return
+        end = min(start + len(texts), len(self.store))
+        for row in range(start, end):
+            self.store.setText(row, texts[row - start])
+        if end > start:
+            self.dataChanged.emit(
+                self.index(start), self.index(end - 1), [Qt.DisplayRole]
+            )
+
+    def setText(self, row, text):
+        self.setTexts(row, [text])
+
+
+class ResultListView(QtWidgets.QListView):
+    """QListView over a ResultListModel, replacing the designer QListWidget."""
+
+    def __init__(self, parent=None):
+        super(ResultListView, self).__init__(parent)
+        self.setModel(ResultListModel(self))
+        # every row is one line of text, skip measuring each of them
+        self.setUniformItemSizes(True)
+        self.setSelectionRectVisible(False)
+
+    def __len__(self):
+        return self.model().rowCount()
+
+    def count(self):
+        return self.model().rowCount()
+
+    def setStore(self, store):
+        self.model().setStore(store)
+
+    def clear(self):
+        self.model().clear()
+
+    def text(self, row):
+        return self.model().text(row)
+
+    def setText(self, row, text):
+        self.model().setText(row, text)
+
+    def selectRows(self, rows, scroll=True):
+        selectRows(self, rows, scroll)
+
+    def selectedRows(self):
+        return sorted(index.row() for index in self.selectionModel().selectedRows())
@@ -0,0 +1,103 @@
+import collections
+import itertools
+import math
+
+
+class ShapeIndex(object):
+    """Uniform grid over shape bounding boxes for hit-testing.
+
+    Each shape is stored in every ``cell_size`` cell its bounding box
+    touches. ``query`` returns the shapes whose (expanded) bounding box
+    contains a point, topmost (most recently added) first. Bounding boxes
+    are padded by ``pad`` so points and straight lines, whose boxes have
+    no area, can still be hit. Callers must call ``update`` after moving
+    or editing a shape's points.
+    """
+
+    def __init__(self, cell_size=128, pad=0.0):
+        self.cell_size = float(cell_size)
+        self.pad = float(pad)
+        self._cells = collections.defaultdict(set)
+        self._entries = {}  # shape -> (order, (x1, y1, x2, y2), cells)
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, shape):
+        return shape in self._entries
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+        self._order = itertools.count()
+
+    def rebuild(self, shapes):
+        self.clear()
+        for shape in shapes:
+            self.insert(shape)
+
+    def _bounds(self, shape):
+        if not shape.points:
+            return None
+        xs = [p.x() for p in shape.points]
+        ys = [p.y() for p in shape.points]
+        x1, y1, x2, y2 = min(xs), min(ys), max(xs), max(ys)
+        # circles extend beyond their two points
+        rect = shape.boundingRect()
+        if not rect.isNull():
+            x1, y1 = min(x1, rect.left()), min(y1, rect.top())
+            x2, y2 = max(x2, rect.right()), max(y2, rect.bottom())
+        pad = self.pad
+        return x1 - pad, y1 - pad, x2 + pad, y2 + pad
+
+    def _cellRange(self, x1, y1, x2, y2):
+        cs = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(int(math.floor(x1 / cs)), int(math.floor(x2 / cs)) + 1)
+            for cy in range(int(math.floor(y1 / cs)), int(math.floor(y2 / cs)) + 1)
+        ]
+
+    def insert(self, shape, order=None):
+        bounds = self._bounds(shape)
+        if bounds is None:
+            return
+        if order is None:
+            order = next(self._order)
+        cells = self._cellRange(*bounds)
+        for cell in cells:
+            self._cells[cell].add(shape)
+        self._entries[shape] = (order, bounds, cells)
+
+    def remove(self, shape):
+        entry = self._entries.pop(shape, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(shape)
+                if not bucket:
+                    del self._cells[cell]
+
+    def update(self, shape):
+        """Re-bin ``shape`` after its points changed, keeping its z-order."""
+        entry = self._entries.get(shape)
+        if entry is None:
+            return
+        self.remove(shape)
+        self.insert(shape, order=entry[0])
+
+    def query(self, point, radius=0.0):
+        x, y = point.x(), point.y()
+        candidates = set()
+        for cell in self._cellRange(x - radius, y - radius, x + radius, y + radius):
+            candidates.update(self._cells.get(cell, ()))
+        hits = []
+        for shape in candidates:
+            order, (x1, y1, x2, y2), _ = self._entries[shape]
+            if x1 - radius <= x <= x2 + radius and y1 - radius <= y <= y2 + radius:
+                hits.append((order, shape))
+        hits.sort(key=lambda h: h[0], reverse=True)
+        return [shape for _, shape in hits]
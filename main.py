@@ -4,28 +4,142 @@ import logging
 import os
 import os.path as osp
 import sys
-from guiocr import __appname__
-from guiocr.app import MainWindow
-from guiocr.utils import newIcon
-from PyQt5 import QtCore, QtGui, QtWidgets
+import time
 
 
 logging.disable(logging.DEBUG)  # 关闭DEBUG日志的打印
 logging.disable(logging.WARNING)  # 关闭WARNING日志的打印
 
+# 冷启动目标耗时(秒)
+STARTUP_BUDGET = 1.0
+
+
+class StartupProfiler(object):
+    """记录启动各阶段耗时"""
+
+    def __init__(self):
+        self.t0 = self.last = time.perf_counter()
+        self.stages = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        total = self.last - self.t0
+        print("Startup profile:")
+        for name, elapsed in self.stages:
+            print("  {:<28s}{:8.1f} ms".format(name, elapsed * 1000))
+        print("  {:<28s}{:8.1f} ms".format("total", total * 1000))
+        print("  paddle imported at startup: {}".format(
+            "yes" if ("paddleocr" in sys.modules or "paddle" in sys.modules) else "no"
+        ))
+        if total > STARTUP_BUDGET:
+            print("  WARNING: cold start exceeds {:.1f}s budget".format(STARTUP_BUDGET))
+
+
+def load_config(args):
+    from guiocr.config import get_config
+
+    config_from_args = {}
+    if args.no_cache:
+        config_from_args.setdefault("ocr", {})["cache"] = {"enabled": False}
+    if getattr(args, "profile_startup", False):
+        # 只统计界面启动，不触发后台模型预热
+        config_from_args.setdefault("ocr", {})["warmup"] = False
+    return get_config(config_from_args=config_from_args)
+
+
+def batch_main(args):
+    from PyQt5 import QtCore
+    from guiocr.batch import run_batch
+
+    config = load_config(args)
+
+    # 无界面模式只需要 QCoreApplication（加载图像格式插件）
+    app = QtCore.QCoreApplication(sys.argv)
+    return run_batch(
+        args.dir,
+        lang=args.lang,
+        workers=args.workers,
+        out_dir=args.out,
+        pattern=args.pattern,
+        backend=args.backend,
+        cache_config=config["ocr"]["cache"],
+    )
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report import and widget construction timings, then exit",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="do not use the OCR result cache"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser(
+        "batch", help="OCR every image under a directory without the GUI"
+    )
+    batch_parser.add_argument("dir", help="image directory (scanned recursively)")
+    batch_parser.add_argument("--lang", default="ch", help="OCR language")
+    batch_parser.add_argument(
+        "--workers", type=int, default=1, help="number of OCR workers"
+    )
+    batch_parser.add_argument(
+        "--out", default="results", help="directory for per-image JSON results"
+    )
+    batch_parser.add_argument(
+        "--backend",
+        choices=["thread", "process"],
+        default="thread",
+        help="run engines in worker threads or in separate processes",
+    )
+    batch_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="do not use the OCR result cache",
+    )
+    batch_parser.add_argument(
+        "--pattern", default=None, help="only process paths containing this"
+    )
+    args = parser.parse_args()
+
+    if args.command == "batch":
+        sys.exit(batch_main(args))
+
+    profiler = StartupProfiler()
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    profiler.mark("import PyQt5")
+    from guiocr import __appname__
+    from guiocr.app import MainWindow
+    from guiocr.utils import newIcon
+    profiler.mark("import guiocr.app")
+
     QtCore.QCoreApplication.setOrganizationDomain("casia")
     QtCore.QCoreApplication.setApplicationName(__appname__)
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName(__appname__)
+    profiler.mark("QApplication")
     # app.setWindowIcon(newIcon("icon"))
-    win = MainWindow()
+    config = load_config(args)
+    win = MainWindow(config=config)
+    profiler.mark("MainWindow.__init__")
     # win = createWindow(win,'blue')
 
     win.show()
     win.raise_()
+    app.processEvents()
+    profiler.mark("show + first paint")
+
+    if args.profile_startup:
+        profiler.report()
+        win.close()
+        return
     sys.exit(app.exec_())
 
 # Press the green button in the gutter to run the script.
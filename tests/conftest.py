@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5 import QtWidgets
+
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        app = QtWidgets.QApplication([])
+    return app
+
+
+@pytest.fixture
+def qt_errors(monkeypatch):
+    """Exceptions raised inside Qt virtual overrides (e.g. paintEvent).
+
+    Without a custom excepthook PyQt5 aborts the process on them.
+    """
+    errors = []
+    monkeypatch.setattr(sys, "excepthook", lambda *exc_info: errors.append(exc_info))
+    return errors
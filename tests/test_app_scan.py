@@ -0,0 +1,41 @@
+import types
+
+from guiocr.app import MainWindow
+
+
+class FakeWindow(object):
+    """Just the state onImagesFound/onScanFinished touch."""
+
+    def __init__(self):
+        self._scanId = 1
+        self._scanOpened = None
+        self._scanPattern = None
+        self._scanLoad = True
+        self._scanStart = 0.0
+        self.filename = None
+        self.imageList = []
+        self.opened = 0
+
+    def openNextImg(self, load=True):
+        # the first image cannot be read, filename stays None
+        self.opened += 1
+
+    def status(self, message, delay=5000):
+        pass
+
+
+def test_unreadable_first_image_is_opened_once_per_scan():
+    win = FakeWindow()
+    win.onImagesFound = types.MethodType(MainWindow.onImagesFound, win)
+    win.onScanFinished = types.MethodType(MainWindow.onScanFinished, win)
+
+    win.onImagesFound(1, [])
+    assert win.opened == 0
+    win.onImagesFound(1, ["a.jpg"])
+    win.onImagesFound(1, ["b.jpg"])
+    win.onScanFinished(1, ["a.jpg", "b.jpg"])
+    assert win.opened == 1
+
+    win._scanId = 2
+    win.onImagesFound(2, ["a.jpg"])
+    assert win.opened == 2
@@ -0,0 +1,25 @@
+import io
+import json
+import os
+
+from guiocr.batch import BatchRunner
+
+
+class FakeBatchRunner(BatchRunner):
+    def process(self, img_path):
+        return {"image": img_path, "lang": self.lang}
+
+
+def test_same_stem_images_write_separate_results(tmp_path):
+    root = tmp_path / "imgs"
+    out_dir = tmp_path / "out"
+    images = [str(root / name) for name in ("a.jpg", "a.png", os.path.join("sub", "a.jpg"))]
+
+    runner = FakeBatchRunner(out_dir=str(out_dir))
+    n_done, n_failed = runner.run(str(root), images, stream=io.StringIO())
+
+    assert (n_done, n_failed) == (3, 0)
+    outputs = sorted(str(p.relative_to(out_dir)) for p in out_dir.rglob("*.json"))
+    assert outputs == sorted(["a.jpg.json", "a.png.json", os.path.join("sub", "a.jpg.json")])
+    with open(out_dir / "a.png.json", encoding="utf-8") as f:
+        assert json.load(f)["image"] == images[1]
@@ -0,0 +1,21 @@
+import numpy as np
+import PIL.Image
+import PIL.ImageEnhance
+import pytest
+
+from guiocr.widgets.brightness_contrast_dialog import BrightnessContrastDialog
+
+
+@pytest.mark.parametrize(
+    "brightness, contrast", [(1.0, 1.0), (1.5, 0.7), (0.6, 1.8), (2.0, 2.0), (0.3, 3.0)]
+)
+def test_lut_matches_pil_enhance(qapp, brightness, contrast):
+    rng = np.random.RandomState(0)
+    img = rng.randint(0, 256, size=(60, 80, 3)).astype(np.uint8)
+    img[:20] //= 4  # skew the luminance histogram
+
+    pil = PIL.ImageEnhance.Brightness(PIL.Image.fromarray(img)).enhance(brightness)
+    pil = PIL.ImageEnhance.Contrast(pil).enhance(contrast)
+
+    dialog = BrightnessContrastDialog(img, lambda qimage: None)
+    np.testing.assert_array_equal(dialog.lut(brightness, contrast)[img], np.asarray(pil))
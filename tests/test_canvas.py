@@ -0,0 +1,116 @@
+from guiocr.widgets import Canvas
+
+
+def _paint(qapp, canvas):
+    canvas.resize(200, 150)
+    canvas.show()
+    canvas.repaint()
+    qapp.processEvents()
+    return canvas.grab()
+
+
+def test_paint_empty_canvas(qapp, qt_errors):
+    canvas = Canvas()
+    _paint(qapp, canvas)
+    canvas.resetState()
+    _paint(qapp, canvas)
+    assert qt_errors == []
+
+
+def test_paint_point_and_line_shapes(qapp, qt_errors):
+    from PyQt5 import QtCore, QtGui
+    from guiocr.shape import Shape
+
+    canvas = Canvas()
+    canvas.loadPixmap(QtGui.QPixmap(400, 300))
+    shapes = []
+    for shape_type, points in [
+        ("point", [(50, 60)]),
+        ("line", [(20, 100), (300, 100)]),
+        ("linestrip", [(30, 10), (30, 200)]),
+    ]:
+        shape = Shape(shape_type=shape_type)
+        for x, y in points:
+            shape.addPoint(QtCore.QPointF(x, y))
+        shapes.append(shape)
+    canvas.loadShapes(shapes)
+    painted = []
+    for shape in shapes:
+        shape.paint = lambda p, shape=shape: painted.append(shape)
+    _paint(qapp, canvas)
+    assert qt_errors == []
+    assert all(shape in painted for shape in shapes)
+
+
+def _mouse(canvas, kind, x, y, button=None):
+    from PyQt5 import QtCore, QtGui
+
+    button = button or QtCore.Qt.NoButton
+    event = QtGui.QMouseEvent(
+        kind, QtCore.QPointF(x, y), button, button, QtCore.Qt.NoModifier
+    )
+    if kind == QtCore.QEvent.MouseMove:
+        canvas.mouseMoveEvent(event)
+    else:
+        canvas.mousePressEvent(event)
+
+
+def test_hover_does_not_materialize_store_rows(qapp, qt_errors):
+    from PyQt5 import QtCore, QtGui
+    from guiocr.utils import OCRResultStore
+
+    canvas = Canvas()
+    canvas.resize(400, 300)
+    canvas.loadPixmap(QtGui.QPixmap(400, 300))
+    canvas.loadShapes([])
+    store = OCRResultStore(
+        [(10, 10, 100, 40), (10, 60, 100, 90), (200, 200, 300, 250)], ["a", "b", "c"]
+    )
+    canvas.loadStore(store)
+    backups = [list(b) for b in canvas.shapesBackups]
+
+    for x, y in [(50, 20), (50, 75), (10, 60), (250, 220), (350, 280)]:
+        _mouse(canvas, QtCore.QEvent.MouseMove, x, y)
+        _paint(qapp, canvas)
+    _mouse(canvas, QtCore.QEvent.MouseMove, 10, 61)
+    assert (canvas.hRow, canvas.hRowVertex) == (1, 0)
+    assert canvas.shapes == []
+    assert not store.materializedMask.any()
+    assert [list(b) for b in canvas.shapesBackups] == backups
+
+    selected = []
+    canvas.selectionChanged.connect(selected.append)
+    _mouse(canvas, QtCore.QEvent.MouseMove, 50, 20)
+    _mouse(canvas, QtCore.QEvent.MouseButtonPress, 50, 20, QtCore.Qt.LeftButton)
+    assert store.materializedMask.tolist() == [True, False, False]
+    assert canvas.shapes == [store.shape(0)]
+    assert selected == [[store.shape(0)]]
+    _paint(qapp, canvas)
+    assert qt_errors == []
+
+
+def test_reorder_and_click_materialize_only_the_chosen_row(qapp, qt_errors):
+    from PyQt5 import QtCore, QtGui
+    from guiocr.utils import OCRResultStore
+
+    canvas = Canvas()
+    canvas.loadPixmap(QtGui.QPixmap(400, 300))
+    canvas.loadShapes([])
+    store = OCRResultStore([(10, 10, 100, 100), (50, 50, 150, 150)], ["a", "b"])
+    canvas.loadStore(store)
+    backups = [list(b) for b in canvas.shapesBackups]
+    point = QtCore.QPointF(75, 75)
+    assert store.hitTest(75, 75) == [1, 0]
+
+    canvas.reorder([], [1, 0])
+    assert store.hitTest(75, 75) == [0, 1]
+    assert not store.materializedMask.any()
+    assert [list(b) for b in canvas.shapesBackups] == backups
+
+    selected = []
+    canvas.selectionChanged.connect(selected.append)
+    canvas.selectShapePoint(point, multiple_selection_mode=False)
+    assert store.materializedMask.tolist() == [True, False]
+    assert selected == [[store.shape(0)]]
+    _paint(qapp, canvas)
+    assert qt_errors == []
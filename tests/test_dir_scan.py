@@ -0,0 +1,37 @@
+import os
+import threading
+
+from guiocr.utils.dir_scan import DirectoryIndex
+from guiocr.utils.dir_scan import DirectoryScanner
+
+
+def _scan(root, index_dir):
+    scanner = DirectoryScanner(index_dir=str(index_dir))
+    return scanner._scan(1, str(root), (".jpg",), threading.Event())
+
+
+def test_file_rewritten_in_place_updates_index(tmp_path):
+    root = tmp_path / "imgs"
+    root.mkdir()
+    (root / "a.jpg").write_bytes(b"a")
+    (root / "b.jpg").write_bytes(b"b")
+    index_dir = tmp_path / "index"
+    assert len(_scan(root, index_dir)) == 2
+
+    # rewrite a.jpg in place; the directory mtime stays the same
+    dir_stat = os.stat(root)
+    (root / "a.jpg").write_bytes(b"rewritten")
+    os.utime(root, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    assert len(_scan(root, index_dir)) == 2
+
+    index = DirectoryIndex(str(root), (".jpg",), str(index_dir))
+    assert index.load()
+    sizes = {name: size for name, size, _ in index.dirs[""]["files"]}
+    assert sizes == {"a.jpg": len(b"rewritten"), "b.jpg": 1}
+
+    index.readDir("")
+    assert index.changed == []
+    (root / "b.jpg").write_bytes(b"bb")
+    os.utime(root, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    index.readDir("")
+    assert index.changed == [os.path.join(str(root), "", "b.jpg")]
@@ -0,0 +1,79 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt
+
+from guiocr.shape import Shape
+from guiocr.utils import OCRResultStore
+from guiocr.widgets import LabelListWidget
+from guiocr.widgets import LabelListWidgetItem
+
+
+def _store(n):
+    return OCRResultStore(
+        [(i, i, i + 10, i + 10) for i in range(n)], ["t%d" % i for i in range(n)]
+    )
+
+
+def _handDrawn():
+    shape = Shape(label="hand")
+    shape.addPoint(QtCore.QPointF(1, 1))
+    shape.addPoint(QtCore.QPointF(5, 5))
+    return shape
+
+
+def test_store_rows_create_no_items(qapp):
+    widget = LabelListWidget()
+    store = _store(10000)
+    widget.setStore(store)
+    widget.resize(200, 300)
+    widget.show()
+    widget.grab()
+
+    model = widget.model()
+    assert len(widget) == 10000
+    assert model._items == {}
+    assert model.index(3).data() == "(3,3),(13,13) (3)"
+    assert not store.materializedMask.any()
+
+
+def test_check_state_is_store_visibility(qapp):
+    widget = LabelListWidget()
+    store = _store(3)
+    widget.setStore(store)
+    changed = []
+    widget.itemChanged.connect(changed.append)
+
+    widget.model().setData(widget.model().index(1), Qt.Unchecked, Qt.CheckStateRole)
+    assert store.visible.tolist() == [True, False, True]
+    assert [item.storeRow() for item in changed] == [1]
+    assert changed[0].shape(materialize=False) is None
+
+    shape = store.shape(2)
+    changed.clear()
+    widget.setAllChecked(False)
+    assert not store.visible.any()
+    assert [item.shape(materialize=False) for item in changed] == [shape]
+
+
+def test_move_rows_keeps_selection_and_paint_order(qapp):
+    widget = LabelListWidget()
+    store = _store(4)
+    widget.setStore(store)
+    hand = _handDrawn()
+    widget.addItem(LabelListWidgetItem("hand", hand, color=(1, 2, 3)))
+    materialized = store.shape(1)
+    assert widget.findItemByShape(hand).text() == "hand"
+    assert widget.findItemByShape(materialized).storeRow() == 1
+
+    widget.selectItems([widget.itemForStoreRow(0)])
+    dropped = []
+    widget.itemDropped.connect(lambda: dropped.append(True))
+    widget.model().moveRowsTo([0], len(widget))
+
+    assert dropped == [True]
+    assert [item.storeRow() for item in widget.selectedItems()] == [0]
+    assert widget.rowOfItem(widget.itemForStoreRow(0)) == 4
+    assert widget.paintOrder() == ([materialized, hand], [2, 3, 0])
+
+    widget.removeItem(widget.findItemByShape(hand))
+    assert len(widget) == 4
+    assert widget.itemForStoreRow(0) is widget[3]
@@ -0,0 +1,15 @@
+import numpy as np
+
+from guiocr.utils.ocr_cache import OCRResultCache
+
+
+def test_put_overwrite_keeps_size(tmp_path):
+    cache = OCRResultCache(str(tmp_path), max_mb=1)
+    key = cache.makeKey(np.zeros((4, 4, 3), np.uint8))
+    record = {"rec_polys": [], "rec_texts": ["a" * 100], "rec_scores": [1.0]}
+    cache.put(key, record)
+    size = cache._size
+    for _ in range(5):
+        cache.put(key, record)
+    assert cache._size == size
+    assert cache.get(key) == record
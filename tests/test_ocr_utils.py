@@ -0,0 +1,99 @@
+import types
+
+import numpy as np
+
+from guiocr.utils import ocr_utils
+
+
+class FakeEngine2(object):
+    """PaddleOCR 2.x: ocr(crops, det=False) returns one list of lines per crop."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+
+    def ocr(self, img, det=True, rec=True, cls=True):
+        self.calls.append(dict(det=det, rec=rec))
+        if not det:
+            return [[(txt, 0.9)] for txt in self.texts[:len(img)]]
+        if not rec:
+            return [[[[0, 10], [5, 10], [5, 15], [0, 15]], [[0, 0], [5, 0], [5, 5], [0, 5]]]]
+        raise AssertionError("full pipeline should not run")
+
+
+class FakeEngine3(object):
+    """PaddleOCR 3.x: ocr() no longer accepts det/rec."""
+
+    _params = {"text_recognition_model_name": "rec_model"}
+
+    def ocr(self, img):
+        raise AssertionError("full pipeline should not run")
+
+
+class FakeModule(object):
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+
+class FakeTextRecognition(FakeModule):
+    def predict(self, input, batch_size=1):
+        return [{"rec_text": "t%d" % i, "rec_score": 0.5} for i in range(len(input))]
+
+
+class FakeTextDetection(FakeModule):
+    def predict(self, input):
+        return [{"dt_polys": np.array([[[0, 10], [5, 10], [5, 15], [0, 15]]])}]
+
+
+def _crops(n):
+    return [np.zeros((8, 16, 3), np.uint8) for _ in range(n)]
+
+
+def test_run_recognition_paddleocr2_batch():
+    engine = FakeEngine2(["a", "b", "c"])
+    assert ocr_utils.run_recognition(engine, _crops(3)) == [
+        ("a", 0.9), ("b", 0.9), ("c", 0.9)
+    ]
+    assert engine.calls == [dict(det=False, rec=True)]
+
+
+def test_run_detection_paddleocr2():
+    boxes = ocr_utils.run_detection(FakeEngine2([]), np.zeros((20, 20, 3), np.uint8))
+    assert [box[0] for box in boxes] == [[0.0, 0.0], [0.0, 10.0]]
+
+
+def test_run_recognition_paddleocr3(monkeypatch):
+    fake = types.SimpleNamespace(TextRecognition=FakeTextRecognition)
+    monkeypatch.setattr(ocr_utils, "import_paddleocr", lambda: fake)
+    engine = FakeEngine3()
+    assert ocr_utils.run_recognition(engine, _crops(2)) == [("t0", 0.5), ("t1", 0.5)]
+    assert engine._guiocr_modules["rec"].model_name == "rec_model"
+
+
+def test_run_detection_paddleocr3(monkeypatch):
+    fake = types.SimpleNamespace(TextDetection=FakeTextDetection)
+    monkeypatch.setattr(ocr_utils, "import_paddleocr", lambda: fake)
+    boxes = ocr_utils.run_detection(FakeEngine3(), np.zeros((20, 20, 3), np.uint8))
+    assert boxes == [[[0.0, 10.0], [5.0, 10.0], [5.0, 15.0], [0.0, 15.0]]]
+
+
+def test_run_detection_unsupported(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "import_paddleocr", lambda: types.SimpleNamespace())
+    assert ocr_utils.run_detection(FakeEngine3(), np.zeros((20, 20, 3), np.uint8)) is None
+
+
+def test_submit_without_image_is_ignored():
+    processor = ocr_utils.OCR_qt()
+    assert processor.submit("") is None
+    assert processor.pendingJobs() == []
+
+
+def test_failed_job_emits_job_failed(tmp_path, qt_errors):
+    processor = ocr_utils.OCR_qt()
+    failed = []
+    processor.jobFailed.connect(lambda job_id, path, message: failed.append((job_id, path)))
+    path = str(tmp_path / "missing.jpg")
+    job_id = processor.submit(path)
+    assert qt_errors == []
+    assert failed == [(job_id, path)]
+    assert processor.pendingJobs() == []
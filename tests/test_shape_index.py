@@ -0,0 +1,31 @@
+from PyQt5 import QtCore
+
+from guiocr.shape import Shape
+from guiocr.widgets import ShapeIndex
+
+
+def _shape(shape_type, *points):
+    shape = Shape(shape_type=shape_type)
+    for x, y in points:
+        shape.addPoint(QtCore.QPointF(x, y))
+    return shape
+
+
+def test_query_point_shape(qapp):
+    index = ShapeIndex(cell_size=64, pad=2)
+    point = _shape("point", (500, 300))
+    index.insert(point)
+    assert index.query(QtCore.QPointF(500, 300)) == [point]
+    assert index.query(QtCore.QPointF(501, 299)) == [point]
+    assert index.query(QtCore.QPointF(0, 0)) == []
+    assert index.query(QtCore.QPointF(490, 300), radius=10) == [point]
+
+
+def test_query_line_and_topmost_first(qapp):
+    index = ShapeIndex(cell_size=64)
+    line = _shape("line", (100, 200), (400, 200))
+    rect = _shape("rectangle", (150, 150), (250, 250))
+    index.insert(line)
+    index.insert(rect)
+    assert index.query(QtCore.QPointF(300, 200)) == [line]
+    assert index.query(QtCore.QPointF(200, 200)) == [rect, line]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from guiocr.utils.tiling import merge_tile_results, run_tiled, tile_grid
+
+CHAR_WIDTH = 20
+
+
+def _line_ocr(x_start, x_end, y1=100, y2=130):
+    """Fake engine seeing one text line, one character per CHAR_WIDTH pixels."""
+    chars = [chr(0x4E00 + i) for i in range((x_end - x_start) // CHAR_WIDTH)]
+
+    def submit(tile, origin):
+        x0, x1 = origin, origin + tile.shape[1]
+        visible = [
+            i for i in range(len(chars))
+            if x_start + i * CHAR_WIDTH >= x0 and x_start + (i + 1) * CHAR_WIDTH <= x1
+        ]
+        if not visible:
+            return {"rec_polys": [], "rec_texts": [], "rec_scores": []}
+        bx1 = max(x_start, x0) - x0
+        bx2 = min(x_end, x1) - x0
+        return {
+            "rec_polys": [[[bx1, y1], [bx2, y1], [bx2, y2], [bx1, y2]]],
+            "rec_texts": ["".join(chars[i] for i in visible)],
+            "rec_scores": [0.9],
+        }
+
+    return "".join(chars), submit
+
+
+def test_line_longer_than_overlap_is_joined_across_seams():
+    width, height = 3000, 400
+    assert [x0 for x0, _, _, _ in tile_grid(height, width)] == [0, 1080, 1720]
+    text, fake = _line_ocr(500, 2500)
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    origins = iter(x0 for x0, _, _, _ in tile_grid(height, width))
+
+    result = run_tiled(image, lambda tile: fake(tile, next(origins)))
+
+    assert result["rec_texts"] == [text]
+    xs = [x for x, _ in result["rec_polys"][0]]
+    assert (min(xs), max(xs)) == (500, 2500)
+
+
+def test_duplicate_in_overlap_is_kept_once():
+    record = {
+        "rec_polys": [[[1100, 10], [1200, 10], [1200, 40], [1100, 40]]],
+        "rec_texts": ["ab"],
+        "rec_scores": [0.9],
+    }
+    shifted = {
+        "rec_polys": [[[20, 10], [120, 10], [120, 40], [20, 40]]],
+        "rec_texts": ["ab"],
+        "rec_scores": [0.8],
+    }
+    result = merge_tile_results(
+        [((0, 0, 1280, 400), record), ((1080, 0, 2360, 400), shifted)], 2360, 400
+    )
+    assert result["rec_texts"] == ["ab"]
+    assert result["rec_scores"] == [0.9]